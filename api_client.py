@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache import (
+    COMPETITION_MATCHES_PATH,
+    ENDPOINT_TTLS,
+    CachedResponse,
+    endpoint_class,
+    get_cache,
+    make_key,
+)
+import metrics
+from pair_index import get_pair_index
+from rate_limiter import RateLimiter, retry_delay
+from single_flight import SingleFlight
+
+# football-data.org v4 base URL (override with FOOTBALL_DATA_BASE_URL, e.g. for a local stub)
+DEFAULT_BASE_URL = 'http://api.football-data.org/v4'
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+
+# How many times a 429 is waited out and retried before giving up
+MAX_RETRIES = 5
+
+
+def _current_matchday(payload):
+    """Pull season.currentMatchday out of a competition matches payload"""
+    for match in payload.get('matches', []):
+        season = match.get('season') or {}
+        if season.get('currentMatchday') is not None:
+            return season['currentMatchday']
+    return None
+
+
+def memoizable(response):
+    """Whether a response may be shared beyond its own in-flight call (successful JSON only)"""
+    if response.status_code != 200 or not isinstance(response, CachedResponse):
+        return False
+    try:
+        payload = response.json()
+    except ValueError:
+        return False
+    return isinstance(payload, dict) and 'error' not in payload
+
+
+class FootballDataClient:
+    """Pooled, cache-aware HTTP client for the football-data.org API"""
+
+    def __init__(self, api_key=None, base_url=None, timeout=DEFAULT_TIMEOUT, pool_size=10, cache=None,
+                 rate_limiter=None, max_retries=MAX_RETRIES, pair_index=None, single_flight=None):
+        self.api_key = api_key or os.getenv('FOOTBALL_DATA_API_KEY')
+        self.base_url = (base_url or os.getenv('FOOTBALL_DATA_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = timeout
+        self.cache = cache if cache is not None else get_cache()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.pair_index = pair_index or get_pair_index()
+        self.single_flight = single_flight or SingleFlight()
+
+        self.session = requests.Session()
+        self.session.headers.update({'X-Auth-Token': self.api_key or ''})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, path):
+        """Turn an endpoint path like /teams/57/matches into a full URL"""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path, params=None, ttl=None):
+        """GET an endpoint, serving fresh responses from the cache when possible.
+
+        Only successful JSON responses are cached. Anything else is returned as the
+        live requests.Response so callers can keep their existing error handling.
+        Identical requests (same URL and params) share one in-flight call, and
+        successful ones are memoized for the rest of the run (see single_flight.py),
+        so repeats cost nothing even with the response cache disabled.
+        """
+        url = self.url(path)
+        return self.single_flight.do(make_key(url, params), lambda: self._get(url, params, ttl), memoizable)
+
+    def _get(self, url, params, ttl):
+        payload = self.cached_payload(url, params)
+        if payload is not None:
+            return CachedResponse(url, payload)
+
+        response = self._send(url, params)
+
+        if response.status_code != 200:
+            return response
+        try:
+            payload = response.json()
+        except ValueError:
+            return response
+        if 'error' in payload:
+            return response
+
+        self.store_payload(url, params, payload, ttl)
+        # Parsed once and shared by every caller of this request
+        fetched = CachedResponse(url, payload, from_cache=False)
+        fetched.headers = response.headers
+        return fetched
+
+    def cached_payload(self, url, params=None):
+        """Fresh cached payload for a request, or None"""
+        if self.cache is None:
+            return None
+        payload = self.cache.get(make_key(url, params))
+        metrics.RESPONSE_CACHE.inc(endpoint_class=endpoint_class(url, params),
+                                   result='hit' if payload is not None else 'miss')
+        if payload is not None:
+            self.pair_index.record_payload(payload)
+        return payload
+
+    def store_payload(self, url, params, payload, ttl=None):
+        """Record a successful payload in the pair index and the response cache"""
+        # Remember which match IDs connect which teams (used for head-to-head lookups)
+        self.pair_index.record_payload(payload)
+
+        if self.cache is not None:
+            klass = endpoint_class(url, params)
+            competition = None
+            match = COMPETITION_MATCHES_PATH.search(url)
+            if match:
+                competition = match.group(1)
+                self.cache.note_matchday(competition, _current_matchday(payload))
+
+            self.cache.set(make_key(url, params), payload, ttl if ttl is not None else ENDPOINT_TTLS[klass], klass, competition)
+
+    def _send(self, url, params):
+        """Send a request through the rate limiter, waiting out any 429s"""
+        endpoint = metrics.endpoint_label(url)
+        for attempt in range(self.max_retries + 1):
+            metrics.API_RATE_LIMIT_WAIT.observe(self.rate_limiter.acquire())
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                metrics.API_REQUESTS.inc(endpoint=endpoint, status='error')
+                raise
+            metrics.API_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+            metrics.API_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+            self.rate_limiter.update_from_headers(response.headers)
+
+            if response.status_code == 429:
+                metrics.API_THROTTLED.inc(endpoint=endpoint)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            delay = retry_delay(response, 60.0 / self.rate_limiter.capacity)
+            print(f"Rate limited by API, retrying in {delay:.0f}s...")
+            self.rate_limiter.penalize(delay)
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key=None):
+    """Return the shared client for an API key (defaults to FOOTBALL_DATA_API_KEY)"""
+    api_key = api_key or os.getenv('FOOTBALL_DATA_API_KEY')
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = FootballDataClient(api_key)
+            _clients[api_key] = client
+    return client
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+import requests
+
+import metrics
+import tracing
+import utils
+from api_client import MAX_RETRIES, get_client, memoizable
+from cache import CachedResponse, make_key
+from get_teams import report_upcoming_error, upcoming_from_response, upcoming_params
+from pair_index import SCAN_PARAMS
+from rate_limiter import retry_delay
+from teams import teams_from_response
+
+# Connections one AsyncFootballDataClient keeps open (override with FOOTBALL_DATA_ASYNC_POOL)
+DEFAULT_POOL_SIZE = int(os.getenv('FOOTBALL_DATA_ASYNC_POOL', '100'))
+
+
+class AsyncResponse(CachedResponse):
+    """A live aiohttp response; json() raises requests' JSONDecodeError (a ValueError) on bad JSON, like requests"""
+
+    def __init__(self, url, body, status_code, headers):
+        super().__init__(url, None, status_code=status_code, from_cache=False)
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        if self._payload is None:
+            try:
+                self._payload = json.loads(self.body)
+            except json.JSONDecodeError as e:
+                raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+        return self._payload
+
+
+class AsyncFootballDataClient:
+    """asyncio counterpart of FootballDataClient, built on one aiohttp session.
+
+    Every request in flight shares the session's connection pool, so hundreds
+    of them can run on one thread. The response cache, pair index and rate
+    limiter are those of the sync client for the same key (get_client), so
+    sync and async code share one cache and one quota. Responses are
+    CachedResponse objects with the same status_code / json() /
+    raise_for_status() interface as the sync client's (json() raises the
+    same JSONDecodeError on a body that is not JSON). Transport errors are raised as
+    requests exceptions, so the sync error handling applies as is.
+
+        async with AsyncFootballDataClient() as client:
+            teams = await get_teams('2021', client=client)
+    """
+
+    def __init__(self, api_key=None, pool_size=DEFAULT_POOL_SIZE, sync_client=None, max_retries=MAX_RETRIES):
+        self.sync = sync_client or get_client(api_key)
+        self.rate_limiter = self.sync.rate_limiter
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.session = None
+
+    def _session(self):
+        # Created lazily so it belongs to the running event loop
+        if self.session is None or self.session.closed:
+            connect, read = self.sync.timeout
+            self.session = aiohttp.ClientSession(
+                headers={'X-Auth-Token': self.sync.api_key or ''},
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+            )
+        return self.session
+
+    async def get(self, path, params=None, ttl=None):
+        """GET an endpoint, serving fresh responses from the shared cache when possible.
+
+        Identical requests share one in-flight call and the sync client's memo.
+        """
+        url = self.sync.url(path)
+        return await self.sync.single_flight.do_async(make_key(url, params), lambda: self._get(url, params, ttl),
+                                                      memoizable)
+
+    async def _get(self, url, params, ttl):
+        payload = self.sync.cached_payload(url, params)
+        if payload is not None:
+            return CachedResponse(url, payload)
+
+        response = await self._send(url, params)
+        if response.status_code != 200:
+            return response
+        try:
+            payload = response.json()
+        except ValueError:
+            return response
+        if isinstance(payload, dict) and 'error' not in payload:
+            self.sync.store_payload(url, params, payload, ttl)
+        return response
+
+    async def _send(self, url, params):
+        """Send a request through the shared rate limiter, waiting out any 429s"""
+        endpoint = metrics.endpoint_label(url)
+        query = {key: str(value) for key, value in (params or {}).items()}
+        for attempt in range(self.max_retries + 1):
+            metrics.API_RATE_LIMIT_WAIT.observe(await self.rate_limiter.acquire_async())
+            start = time.perf_counter()
+            try:
+                async with self._session().get(url, params=query) as raw:
+                    body = await raw.read()
+                    status, headers = raw.status, raw.headers
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.API_REQUESTS.inc(endpoint=endpoint, status='error')
+                raise requests.exceptions.ConnectionError(f"{type(e).__name__}: {e} ({url})") from e
+            metrics.API_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+            metrics.API_REQUESTS.inc(endpoint=endpoint, status=status)
+            self.rate_limiter.update_from_headers(headers)
+
+            response = AsyncResponse(url, body, status, headers)
+
+            if status == 429:
+                metrics.API_THROTTLED.inc(endpoint=endpoint)
+            if status != 429 or attempt == self.max_retries:
+                return response
+
+            delay = retry_delay(response, 60.0 / self.rate_limiter.capacity)
+            print(f"Rate limited by API, retrying in {delay:.0f}s...")
+            self.rate_limiter.penalize(delay)
+        return response
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+@asynccontextmanager
+async def client_or_new(client=None, api_key=None):
+    """Use the given client, or open one for the duration of the block"""
+    if client is not None:
+        yield client
+        return
+    async with AsyncFootballDataClient(api_key) as new_client:
+        yield new_client
+
+
+async def get_teams(league_code, api_token=None, client=None):
+    """Coroutine version of teams.get_teams"""
+    async with client_or_new(client, api_token) as client:
+        response = await client.get(f"/competitions/{league_code}/teams")
+    return teams_from_response(response)
+
+
+async def fetch_upcoming_matches(competition_id, api_key=None, date_from=None, date_to=None, client=None):
+    """Coroutine version of get_teams.fetch_upcoming_matches"""
+    params = upcoming_params(date_from, date_to)
+    print(f"\nQuerying matches from {params['dateFrom']} to {params['dateTo']}")
+    try:
+        async with client_or_new(client, api_key) as client:
+            response = await client.get(f"/competitions/{competition_id}/matches", params=params)
+        return upcoming_from_response(response, params)
+    except Exception as e:
+        return report_upcoming_error(e)
+
+
+async def fetch_team_matches(team_id, days_back=90, store=None, client=None):
+    """Coroutine version of utils.fetch_team_matches"""
+    if store is not None:
+        return utils.fetch_team_matches(team_id, days_back, store)
+    async with client_or_new(client) as client:
+        response = await client.get(f"/teams/{team_id}/matches", params=utils.finished_params(days_back))
+    return utils.team_matches_from_response(response, team_id)
+
+
+async def get_team_matches(team_id, days_back=90, store=None, client=None):
+    """Coroutine version of utils.get_team_matches"""
+    return utils.played_matches(await fetch_team_matches(team_id, days_back, store, client))
+
+
+async def get_competition_matches(competition_id, days_back=90, store=None, client=None):
+    """Coroutine version of utils.get_competition_matches"""
+    if store is not None:
+        return utils.get_competition_matches(competition_id, days_back, store)
+    async with client_or_new(client) as client:
+        response = await client.get(f"/competitions/{competition_id}/matches", params=utils.finished_params(days_back))
+    return utils.competition_matches_from_response(response, competition_id)
+
+
+async def find_match_id(client, team1_id, team2_id):
+    """Coroutine version of pair_index.find_match_id"""
+    index = client.sync.pair_index
+    match_id = index.lookup(team1_id, team2_id)
+    if match_id:
+        return match_id
+
+    response = await client.get(f"/teams/{team1_id}/matches", params=SCAN_PARAMS)
+    response.raise_for_status()
+
+    # The client records every payload it returns, so the scan has filled the index
+    return index.lookup(team1_id, team2_id)
+
+
+async def get_head_to_head(team1_id, team2_id, store=None, client=None):
+    """Coroutine version of utils.get_head_to_head"""
+    if store is not None:
+        return utils.get_stored_head_to_head(store, team1_id, team2_id)
+
+    try:
+        async with client_or_new(client) as client:
+            # Any match between the two teams unlocks the head2head endpoint
+            with tracing.span('h2h_match_id', team1=team1_id, team2=team2_id):
+                match_id = await find_match_id(client, team1_id, team2_id)
+
+            if not match_id:
+                return None
+
+            with tracing.span('h2h_fetch', match=match_id, team1=team1_id, team2=team2_id):
+                response = await client.get(f"/matches/{match_id}/head2head", params={'limit': 60})
+        response.raise_for_status()
+        return utils.parse_head_to_head(response.json(), team1_id, team2_id)
+
+    except requests.exceptions.RequestException as e:
+        print(f"API Error: {str(e)}")
+        return None
+    except Exception as e:
+        print(f"Error processing head-to-head data: {str(e)}")
+        return None
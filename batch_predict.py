@@ -0,0 +1,88 @@
+import argparse
+import contextlib
+import json
+import sys
+
+import metrics
+import tracing
+from leagues import LEAGUE_IDS
+from match_store import MatchStore
+from match_predictor import DEFAULT_ENGINE, DEFAULT_WORKERS, ENGINES
+from league_pipeline import DEFAULT_LEAGUE_WORKERS, LeaguePipeline
+
+
+def run(leagues, output, date_from=None, date_to=None, workers=DEFAULT_WORKERS, engine=DEFAULT_ENGINE,
+        llm_batch_size=1, store=None, league_workers=DEFAULT_LEAGUE_WORKERS, use_async=False):
+    """Predict every fixture of the given leagues, writing one JSON object per line to output.
+
+    Leagues are loaded and predicted together by a LeaguePipeline (with
+    use_async, all API data is fetched up front on one event loop). Each
+    line is written and flushed as soon as its fixture is done. Returns the
+    pipeline so callers can read its summary().
+    """
+    pipeline = LeaguePipeline(
+        leagues, max_workers=workers, league_workers=league_workers, engine=engine, store=store,
+        llm_batch_size=llm_batch_size, date_from=date_from, date_to=date_to
+    )
+    if use_async:
+        import asyncio
+        asyncio.run(pipeline.load_async())
+    for league_name, result in pipeline.iter_predictions():
+        output.write(json.dumps({'league': league_name, **result}) + "\n")
+        output.flush()
+    return pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict fixtures without prompts, streaming JSON lines")
+    parser.add_argument('leagues', nargs='*', help="League names (default: all leagues)")
+    parser.add_argument('--from', dest='date_from', help="First fixture date, YYYY-MM-DD (default: today)")
+    parser.add_argument('--to', dest='date_to', help="Last fixture date, YYYY-MM-DD (default: 30 days ahead)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Fixtures analyzed in parallel")
+    parser.add_argument('--league-workers', type=int, default=DEFAULT_LEAGUE_WORKERS,
+                        help="Leagues loaded in parallel")
+    parser.add_argument('--engine', choices=ENGINES, default=DEFAULT_ENGINE, help="Prediction engine")
+    parser.add_argument('--llm-batch-size', type=int, default=1, help="Fixtures packed into one LLM request")
+    parser.add_argument('--store', action='store_true', help="Read from the local match store instead of the API")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Fetch all API data concurrently on one event loop (needs aiohttp)")
+    parser.add_argument('-o', '--output', help="Write JSON lines to this file instead of stdout")
+    parser.add_argument('--metrics-file', default=metrics.METRICS_FILE,
+                        help="Write a metrics snapshot here at the end (*.json, otherwise Prometheus text)")
+    parser.add_argument('--metrics-port', type=int, default=metrics.METRICS_PORT,
+                        help="Serve live metrics on this local port while running")
+    parser.add_argument('--trace', default=tracing.TRACE_FILE,
+                        help="Write a Chrome trace of every stage (with fixture and team IDs) to this file")
+    parser.add_argument('--profile', help="Sample the run and write folded stacks (flame graph input) to this file")
+
+    args = parser.parse_args()
+    unknown = [league for league in args.leagues if league not in LEAGUE_IDS]
+    if unknown:
+        parser.error(f"unknown league(s): {', '.join(unknown)} (choose from {', '.join(sorted(LEAGUE_IDS))})")
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        # Progress messages go to stderr so stdout carries nothing but JSON lines
+        with contextlib.redirect_stdout(sys.stderr):
+            metrics.start(args.metrics_port)
+            if args.trace:
+                tracing.enable()
+            with tracing.profiled(args.profile):
+                pipeline = run(
+                    args.leagues or list(LEAGUE_IDS), output, args.date_from, args.date_to, args.workers,
+                    args.engine, args.llm_batch_size, MatchStore() if args.store else None, args.league_workers,
+                    args.use_async
+                )
+            summary = pipeline.summary()
+            print(f"\nProcessed {summary['fixtures']} fixture(s) in {summary['leagues']} league(s): "
+                  f"loaded in {summary['load_seconds']}s, predicted in {summary['predict_seconds']}s, "
+                  f"{summary['api']['requests']} API request(s), {summary['api']['throttled']} throttled")
+            metrics.export(args.metrics_file)
+            tracing.export(args.trace)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Synthetic Sofascore Head-to-Head data for the scraper benchmarks."""
+import html
+import random
+from datetime import date, timedelta
+
+TEAMS = ['Manchester United', 'Liverpool', 'Arsenal', 'Chelsea', 'Tottenham', 'Newcastle']
+COMPETITIONS = ['Premier League', 'FA Cup', 'EFL Cup', 'UEFA Champions League', 'Community Shield']
+STATUSES = ['FT', 'FT', 'FT', 'AP', 'Postponed']
+
+
+def h2h_lines(rng, team1, team2, matches=20, start=date(2024, 5, 1)):
+    """Raw H2H text lines in the layout the Sofascore page renders, newest match first"""
+    lines = ['Head-to-Head', f'At {team1}', 'This Tournament']
+    competition = None
+    day = start
+    for _ in range(matches):
+        day -= timedelta(days=rng.randint(20, 200))
+        if competition is None or rng.random() < 0.3:
+            competition = rng.choice(COMPETITIONS)
+            lines.append(competition)
+        home, away = (team1, team2) if rng.random() < 0.5 else (team2, team1)
+        status = rng.choice(STATUSES)
+        lines += [day.strftime('%d/%m/%y'), status, home, away]
+        if status != 'Postponed':
+            lines += [str(rng.randint(0, 4)), str(rng.randint(0, 4))]
+    lines.append('Sofascore Ratings')
+    return lines
+
+
+def render_page(lines, filler=2000, seed=0):
+    """A match page: filler markup (a realistic DOM size) followed by the H2H block and a footer"""
+    rng = random.Random(seed)
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Match</title></head><body>']
+    parts.append('<nav>' + ''.join(
+        f'<div class="row"><span>Odds {rng.randint(100, 999) / 100}</span><a href="#">Link {i}</a></div>'
+        for i in range(filler)
+    ) + '</nav>')
+    parts.append('<section id="h2h">' + ''.join(f'<div>{html.escape(line)}</div>' for line in lines) + '</section>')
+    parts.append('<footer><p>*IMPORTANT NOTICE: data is provided for information only.</p></footer>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def generate_pages(directory, count=10, matches=20, filler=2000, seed=0):
+    """Write count synthetic match pages into directory; returns their file names"""
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        team1, team2 = rng.sample(TEAMS, 2)
+        name = f'h2h_{i:03d}.html'
+        with open(f'{directory}/{name}', 'w', encoding='utf-8') as f:
+            f.write(render_page(h2h_lines(rng, team1, team2, matches), filler, seed + i))
+        names.append(name)
+    return names
+
+
+def h2h_dump(rng, pairs=100, matches=25):
+    """A large raw dump: many pairs' H2H blocks back to back, as lines"""
+    lines = []
+    for _ in range(pairs):
+        team1, team2 = rng.sample(TEAMS, 2)
+        lines += h2h_lines(rng, team1, team2, matches)
+    return lines
+
+
+def write_corpus(directory, files=5, pairs=2000, matches=25, seed=0):
+    """Write files raw dumps of pairs H2H blocks each into directory; returns their paths"""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        path = f'{directory}/h2h_dump_{i:02d}.txt'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(h2h_dump(rng, pairs, matches)) + '\n')
+        paths.append(path)
+    return paths
@@ -0,0 +1,83 @@
+"""Throughput of the Head-to-Head text parser, in lines per second.
+
+Parses large raw H2H dumps (a saved corpus, or one generated on the fly)
+without the year cut-off, so every line is tokenized.
+
+    python benchmarks/parser_benchmark.py
+    python benchmarks/parser_benchmark.py --write-corpus corpus/ --files 5
+    python benchmarks/parser_benchmark.py --corpus corpus/ --output results.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from football_scraper import iter_head_to_head
+from h2h_corpus import write_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_head_to_head_data throughput")
+    parser.add_argument('--corpus', help="Directory of raw .txt dumps (default: generate a temporary corpus)")
+    parser.add_argument('--write-corpus', help="Generate a corpus into this directory and exit")
+    parser.add_argument('--files', type=int, default=3, help="Dumps to generate")
+    parser.add_argument('--pairs', type=int, default=2000, help="H2H blocks per generated dump")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes over the corpus (best is reported)")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.write_corpus:
+        os.makedirs(args.write_corpus, exist_ok=True)
+        for path in write_corpus(args.write_corpus, args.files, args.pairs):
+            print(path)
+        return
+
+    temp_dir = None
+    if args.corpus:
+        paths = sorted(os.path.join(args.corpus, name) for name in os.listdir(args.corpus) if name.endswith('.txt'))
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        paths = write_corpus(temp_dir.name, args.files, args.pairs)
+
+    try:
+        line_counts = []
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                line_counts.append(sum(1 for _ in f))
+        total_lines = sum(line_counts)
+
+        best = None
+        for _ in range(args.repeat):
+            matches = 0
+            start = time.perf_counter()
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    for _ in iter_head_to_head(f, since_year=None):
+                        matches += 1
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    results = {
+        'files': len(paths),
+        'lines': total_lines,
+        'matches': matches,
+        'seconds': round(best, 4),
+        'lines_per_second': round(total_lines / best),
+        'matches_per_second': round(matches / best),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Memory and access-time benchmark for MatchRecord against raw API matches.
+
+Builds a synthetic multi-season, multi-league history of raw football-data
+matches (as json.loads returns them), then measures:
+- memory held by the raw dicts and by the projected MatchRecords (tracemalloc)
+- the projection itself
+- building the FormTable columns by walking the nested dicts (as the
+  stats code used to) and with played_columns over the records
+- FormTable.from_matches over the records
+
+    python benchmarks/record_benchmark.py
+    python benchmarks/record_benchmark.py --leagues 12 --seasons 5 --output record_results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from form_stats import FormTable
+from match_record import played_columns, project
+from record_fixtures import api_match
+
+
+def synthetic_history(leagues, seasons, teams_per_league=20, seed=0):
+    """Raw API matches for `seasons` double round-robins in each of `leagues` leagues"""
+    rng = random.Random(seed)
+    start = datetime(2024, 8, 1, 15)
+    matches = []
+    for league in range(leagues):
+        teams = [(1000 * (league + 1) + i, f"Team {league}-{i} FC", f"Team {league}-{i}") for i in range(teams_per_league)]
+        for season in range(seasons):
+            for home in teams:
+                for away in teams:
+                    if home is away:
+                        continue
+                    kickoff = start - timedelta(days=365 * season + rng.randrange(300))
+                    match = api_match(len(matches) + 1, home, away, kickoff, rng.randrange(5), rng.randrange(4))
+                    match['competition'] = {'id': league, 'name': f"League {league}", 'code': f"L{league}"}
+                    matches.append(match)
+    # Round-trip through JSON so every string is its own object, as in a parsed response
+    return json.loads(json.dumps(matches))
+
+
+def allocated(build):
+    """(result, bytes still allocated by build())"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def dict_columns(matches):
+    """The column walk FormTable and PoissonModel used to do over raw API matches"""
+    seen = set()
+    columns = ([], [], [], [], [])
+    for match in matches:
+        score = match['score']['fullTime']
+        if score['home'] is None or score['away'] is None:
+            continue
+        match_id = match.get('id')
+        if match_id is not None:
+            if match_id in seen:
+                continue
+            seen.add(match_id)
+        columns[0].append(match['homeTeam']['id'])
+        columns[1].append(match['awayTeam']['id'])
+        columns[2].append(score['home'])
+        columns[3].append(score['away'])
+        columns[4].append(match['utcDate'].rstrip('Z'))
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare raw API match dicts with MatchRecords")
+    parser.add_argument('--leagues', type=int, default=12, help="Leagues in the history")
+    parser.add_argument('--seasons', type=int, default=3, help="Seasons per league")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per measurement (best is reported)")
+    parser.add_argument('--output', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    payload = json.dumps(synthetic_history(args.leagues, args.seasons))
+    raw, raw_bytes = allocated(lambda: json.loads(payload))
+    records, record_bytes = allocated(lambda: project(raw))
+    print(f"{len(raw)} matches ({args.leagues} leagues x {args.seasons} seasons)")
+    print(f"raw API dicts  {raw_bytes / 2 ** 20:8.1f} MiB  ({raw_bytes / len(raw):.0f} B/match)")
+    print(f"MatchRecords   {record_bytes / 2 ** 20:8.1f} MiB  ({record_bytes / len(raw):.0f} B/match, "
+          f"{raw_bytes / record_bytes:.1f}x smaller)")
+
+    timings = {
+        'project': timed(lambda: project(raw), args.repeat),
+        'columns_from_dicts': timed(lambda: dict_columns(raw), args.repeat),
+        'columns_from_records': timed(lambda: played_columns(records), args.repeat),
+        'form_table_from_records': timed(lambda: FormTable.from_matches(records), args.repeat),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:24s} {seconds * 1000:8.1f} ms")
+
+    if args.output:
+        report = {
+            'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'python': platform.python_version(),
+            'matches': len(raw),
+            'raw_bytes': raw_bytes,
+            'record_bytes': record_bytes,
+            'timings_ms': {name: round(seconds * 1000, 2) for name, seconds in timings.items()},
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
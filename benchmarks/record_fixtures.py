@@ -0,0 +1,172 @@
+"""Build a directory of football-data responses for stub_server.py.
+
+By default a deterministic synthetic Premier League season is written (20
+teams, finished and scheduled matches, team histories and head-to-heads).
+With --live, the same endpoints are recorded from the real API instead
+(needs FOOTBALL_DATA_API_KEY and respects the rate limit).
+
+    python benchmarks/record_fixtures.py fixtures/
+    python benchmarks/record_fixtures.py fixtures/ --live --league "Premier League" --pairs 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from itertools import permutations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leagues import LEAGUE_IDS
+
+PREMIER_LEAGUE = {'id': 2021, 'name': 'Premier League', 'code': 'PL'}
+
+TEAMS = [
+    (57, 'Arsenal FC', 'Arsenal'), (58, 'Aston Villa FC', 'Aston Villa'), (61, 'Chelsea FC', 'Chelsea'),
+    (62, 'Everton FC', 'Everton'), (63, 'Fulham FC', 'Fulham'), (64, 'Liverpool FC', 'Liverpool'),
+    (65, 'Manchester City FC', 'Man City'), (66, 'Manchester United FC', 'Man United'),
+    (67, 'Newcastle United FC', 'Newcastle'), (73, 'Tottenham Hotspur FC', 'Tottenham'),
+    (76, 'Wolverhampton Wanderers FC', 'Wolverhampton'), (338, 'Leicester City FC', 'Leicester City'),
+    (340, 'Southampton FC', 'Southampton'), (349, 'Ipswich Town FC', 'Ipswich Town'),
+    (351, 'Nottingham Forest FC', 'Nottingham'), (354, 'Crystal Palace FC', 'Crystal Palace'),
+    (397, 'Brighton & Hove Albion FC', 'Brighton Hove'), (402, 'Brentford FC', 'Brentford'),
+    (563, 'West Ham United FC', 'West Ham'), (1044, 'AFC Bournemouth', 'Bournemouth'),
+]
+
+
+def write(directory, relative, body):
+    path = os.path.join(directory, relative + '.json')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(body, f)
+
+
+def api_match(match_id, home, away, kickoff, home_goals=None, away_goals=None):
+    finished = home_goals is not None
+    winner = None
+    if finished:
+        winner = 'HOME_TEAM' if home_goals > away_goals else 'AWAY_TEAM' if away_goals > home_goals else 'DRAW'
+    return {
+        'id': match_id,
+        'utcDate': kickoff.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'status': 'FINISHED' if finished else 'SCHEDULED',
+        'matchday': None,
+        'lastUpdated': kickoff.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'competition': dict(PREMIER_LEAGUE),
+        'season': {'currentMatchday': None},
+        'venue': f"{home[1].replace(' FC', '')} Stadium",
+        'homeTeam': {'id': home[0], 'name': home[1], 'shortName': home[2]},
+        'awayTeam': {'id': away[0], 'name': away[1], 'shortName': away[2]},
+        'score': {'winner': winner, 'fullTime': {'home': home_goals, 'away': away_goals}},
+    }
+
+
+def head2head(matches, home_id, away_id):
+    """The API's head2head payload for a list of meetings (newest first)"""
+    def tally(team_id):
+        record = {'id': team_id, 'wins': 0, 'draws': 0, 'losses': 0}
+        for m in matches:
+            score = m['score']['fullTime']
+            own, other = (score['home'], score['away']) if m['homeTeam']['id'] == team_id else (score['away'], score['home'])
+            record['wins' if own > other else 'draws' if own == other else 'losses'] += 1
+        return record
+
+    return {
+        'aggregates': {
+            'numberOfMatches': len(matches),
+            'totalGoals': sum(m['score']['fullTime']['home'] + m['score']['fullTime']['away'] for m in matches),
+            'homeTeam': tally(home_id),
+            'awayTeam': tally(away_id),
+        },
+        'matches': matches,
+    }
+
+
+def synthetic(directory, seed=0, finished=300):
+    """One double round-robin season: `finished` results in the past, the rest scheduled"""
+    rng = random.Random(seed)
+    strength = {team[0]: rng.uniform(0.6, 1.8) for team in TEAMS}
+    now = datetime.now(timezone.utc).replace(hour=15, minute=0, second=0, microsecond=0)
+
+    fixtures = list(permutations(TEAMS, 2))
+    rng.shuffle(fixtures)
+    matches = []
+    for i, (home, away) in enumerate(fixtures):
+        if i < finished:
+            kickoff = now - timedelta(days=1 + (finished - i) * 250 // finished)
+            goals = (rng.choices(range(6), weights=[30 / strength[home[0]], 35, 20, 10, 4, 1])[0],
+                     rng.choices(range(6), weights=[30 / strength[away[0]], 35, 18, 8, 3, 1])[0])
+            matches.append(api_match(10000 + i, home, away, kickoff, *goals))
+        else:
+            kickoff = now + timedelta(days=1 + (i - finished) * 28 // (len(fixtures) - finished))
+            matches.append(api_match(10000 + i, home, away, kickoff))
+    matches.sort(key=lambda m: m['utcDate'])
+
+    teams = [{'id': t[0], 'name': t[1], 'shortName': t[2], 'tla': t[2][:3].upper()} for t in TEAMS]
+    write(directory, 'competitions/2021/teams', {'count': len(teams), 'competition': PREMIER_LEAGUE, 'teams': teams})
+    write(directory, 'competitions/2021/matches', {'competition': PREMIER_LEAGUE, 'matches': matches})
+    for competition_id in LEAGUE_IDS.values():
+        if competition_id != '2021':
+            write(directory, f'competitions/{competition_id}/teams', {'count': 0, 'teams': []})
+
+    played = [m for m in matches if m['status'] == 'FINISHED']
+    for team_id, _, _ in TEAMS:
+        history = [m for m in matches if team_id in (m['homeTeam']['id'], m['awayTeam']['id'])]
+        write(directory, f'teams/{team_id}/matches', {'matches': list(reversed(history))})
+    # The pair index hands out a pair's most recent match, usually the scheduled one,
+    # so the head-to-head is written under every match ID of the pair
+    for match in matches:
+        home_id, away_id = match['homeTeam']['id'], match['awayTeam']['id']
+        meetings = [m for m in played if {m['homeTeam']['id'], m['awayTeam']['id']} == {home_id, away_id}]
+        write(directory, f"matches/{match['id']}/head2head", head2head(list(reversed(meetings)), home_id, away_id))
+    return len(matches)
+
+
+def live(directory, league_name, pairs):
+    """Record the endpoints a prediction run touches from the real API"""
+    from api_client import get_client
+
+    client = get_client()
+    competition_id = LEAGUE_IDS[league_name]
+
+    def record(relative, params=None):
+        response = client.get('/' + relative, params=params)
+        response.raise_for_status()
+        body = response.json()
+        write(directory, relative, body)
+        print(f"recorded {relative}")
+        return body
+
+    record(f'competitions/{competition_id}/teams')
+    matches = record(f'competitions/{competition_id}/matches')['matches']
+    upcoming = [m for m in matches if m['status'] in ('SCHEDULED', 'TIMED')][:pairs]
+    for match in upcoming:
+        for side in ('homeTeam', 'awayTeam'):
+            history = record(f"teams/{match[side]['id']}/matches", {'status': 'FINISHED', 'limit': 200})['matches']
+            if side == 'homeTeam':
+                away_id = match['awayTeam']['id']
+                meetings = [m for m in history if away_id in (m['homeTeam']['id'], m['awayTeam']['id'])]
+                # Stored under the upcoming fixture too, the ID the pair index hands out
+                body = record(f"matches/{match['id']}/head2head", {'limit': 60})
+                for meeting in meetings:
+                    write(directory, f"matches/{meeting['id']}/head2head", body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write recorded football-data responses for the stub server")
+    parser.add_argument('directory')
+    parser.add_argument('--live', action='store_true', help="Record from the real API instead of generating")
+    parser.add_argument('--league', default='Premier League', choices=sorted(LEAGUE_IDS), help="League to record (--live)")
+    parser.add_argument('--pairs', type=int, default=10, help="Upcoming fixtures whose team data is recorded (--live)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic season")
+    args = parser.parse_args()
+
+    if args.live:
+        live(args.directory, args.league, args.pairs)
+    else:
+        print(f"Wrote a synthetic season of {synthetic(args.directory, args.seed)} matches to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""End-to-end benchmarks against the local stub server, with no network access.
+
+Replays recorded football-data responses (record_fixtures.py; a synthetic
+season by default) and a stub OpenAI endpoint, then times:
+
+- MatchAnalyzer.compare_teams
+- MatchPredictor.fetch_league_fixtures
+- a full MatchPredictor.process_next_batch sweep over the league's fixtures
+- the async driver: fetch_league_fixtures_async plus prefetch_async of
+  every fixture's head-to-head (needs aiohttp)
+
+For each one it records wall time (per repetition, median and best), API
+calls by endpoint and LLM calls. The results are written as JSON.
+
+    python benchmarks/run_benchmarks.py --output benchmark_results.json
+    python benchmarks/run_benchmarks.py --fixtures recorded/ --llm-latency 0.8 --repeat 5
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from record_fixtures import synthetic
+from stub_server import StubServer
+
+
+def configure(server, work_dir, args):
+    """Point every client at the stub and every cache at work_dir (before the repo modules are imported)"""
+    os.environ.update({
+        'FOOTBALL_DATA_BASE_URL': f"{server.url}/v4",
+        'FOOTBALL_DATA_API_KEY': 'benchmark',
+        'OPENAI_BASE_URL': f"{server.url}/v1",
+        'OPENAI_API_KEY': 'benchmark',
+        'FOOTBALL_DATA_RATE_LIMIT': str(args.rate_limit),
+        'FOOTBALL_CACHE_PATH': os.path.join(work_dir, 'cache.sqlite'),
+        'TEAM_DIRECTORY_PATH': os.path.join(work_dir, 'team_directory.json'),
+        'MATCH_STORE_PATH': os.path.join(work_dir, 'matches.sqlite'),
+        'PREDICTION_CACHE_PATH': os.path.join(work_dir, 'predictions.sqlite'),
+        'PREDICTOR_WORKERS': str(args.workers),
+        'PREDICTION_ENGINE': args.engine,
+    })
+    if not args.warm_cache:
+        os.environ['FOOTBALL_CACHE_DISABLED'] = '1'
+        os.environ['PREDICTION_CACHE_DISABLED'] = '1'
+
+
+def require_h2h(name, h2h):
+    """Fail the run when a benchmark saw no head-to-head data (the fixtures are missing head2head responses)"""
+    if not h2h or any(result is None for result in h2h):
+        missing = sum(result is None for result in h2h)
+        raise RuntimeError(f"{name}: {missing} of {len(h2h)} head-to-head lookup(s) returned no data; "
+                           f"check that the fixtures have matches/{{id}}/head2head for every match ID")
+
+
+def tracking_h2h(predictor):
+    """Wrap predictor.get_head_to_head so every result it returns is kept in predictor.h2h_seen"""
+    fetch = predictor.get_head_to_head
+    predictor.h2h_seen = []
+
+    def get_head_to_head(team1_id, team2_id):
+        h2h = fetch(team1_id, team2_id)
+        predictor.h2h_seen.append(h2h)
+        return h2h
+
+    predictor.get_head_to_head = get_head_to_head
+    return predictor
+
+
+def measure(server, name, repeat, setup, run, quiet=True, h2h=None, reset=None):
+    """Run setup() then time run(state) repeat times, counting stub calls per run.
+
+    reset() runs after each setup(), before the timer starts (the cold runs
+    use it to empty the client's in-memory request memo). h2h(state, value)
+    returns the head-to-head results the run produced; they are checked
+    after every repetition (see require_h2h).
+    """
+    timings = []
+    calls = None
+    for _ in range(repeat):
+        state = setup()
+        if reset is not None:
+            reset()
+        server.reset()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            start = time.perf_counter()
+            value = run(state)
+            timings.append(time.perf_counter() - start)
+        calls = server.snapshot()
+        if h2h is not None:
+            require_h2h(name, h2h(state, value))
+    api_calls = {k: v for k, v in calls.items() if not k.startswith('openai:')}
+    result = {
+        'name': name,
+        'runs': [round(t, 4) for t in timings],
+        'median_seconds': round(statistics.median(timings), 4),
+        'best_seconds': round(min(timings), 4),
+        'api_calls': sum(api_calls.values()),
+        'api_calls_by_endpoint': api_calls,
+        'llm_calls': sum(v for k, v in calls.items() if k.startswith('openai:')),
+    }
+    print(f"{name}: median {result['median_seconds']}s, best {result['best_seconds']}s, "
+          f"{result['api_calls']} API call(s), {result['llm_calls']} LLM call(s)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmarks against a stub API")
+    parser.add_argument('--fixtures', help="Recorded responses directory (default: a generated synthetic season)")
+    parser.add_argument('--league', default='Premier League', help="League for the predictor benchmarks")
+    parser.add_argument('--teams', nargs=2, default=['Arsenal', 'Chelsea'], help="Pair for compare_teams")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetitions per benchmark")
+    parser.add_argument('--api-latency', type=float, default=0.0, help="Seconds added to each football-data response")
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="Seconds added to each chat completion")
+    parser.add_argument('--rate-limit', type=int, default=100000, help="Client requests per minute")
+    parser.add_argument('--workers', type=int, default=4, help="PREDICTOR_WORKERS for the sweep")
+    parser.add_argument('--engine', default='gpt', choices=['gpt', 'poisson', 'hybrid'], help="Prediction engine")
+    parser.add_argument('--warm-cache', action='store_true', help="Keep the response and prediction caches enabled")
+    parser.add_argument('--verbose', action='store_true', help="Show the code's own progress output")
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        fixtures = args.fixtures
+        if fixtures is None:
+            fixtures = os.path.join(work_dir, 'fixtures')
+            synthetic(fixtures)
+
+        with StubServer(fixtures, api_latency=args.api_latency, llm_latency=args.llm_latency) as server:
+            configure(server, work_dir, args)
+            from api_client import get_client
+            from match_analyzer import MatchAnalyzer
+            from match_predictor import MatchPredictor
+
+            quiet = not args.verbose
+            # Without --warm-cache every repetition starts cold, memoized responses included
+            reset = None if args.warm_cache else get_client().single_flight.clear
+            results = []
+
+            def loaded_predictor():
+                predictor = tracking_h2h(MatchPredictor())
+                with contextlib.redirect_stdout(io.StringIO()):
+                    predictor.fetch_league_fixtures(args.league)
+                return predictor
+
+            results.append(measure(
+                server, 'compare_teams', args.repeat, MatchAnalyzer,
+                lambda analyzer: analyzer.compare_teams(*args.teams), quiet, reset=reset,
+                h2h=lambda analyzer, comparison: [comparison.get('head_to_head') if isinstance(comparison, dict) else None]
+            ))
+            results.append(measure(
+                server, 'fetch_league_fixtures', args.repeat, MatchPredictor,
+                lambda predictor: predictor.fetch_league_fixtures(args.league), quiet, reset=reset
+            ))
+            results.append(measure(
+                server, 'process_next_batch_sweep', args.repeat, loaded_predictor,
+                lambda predictor: predictor.process_next_batch(batch_size=len(predictor.fixtures)), quiet, reset=reset,
+                h2h=lambda predictor, _: predictor.h2h_seen
+            ))
+
+            async def load_async(predictor):
+                await predictor.fetch_league_fixtures_async(args.league)
+                await predictor.prefetch_async()
+
+            results.append(measure(
+                server, 'fetch_and_prefetch_async', args.repeat, MatchPredictor,
+                lambda predictor: asyncio.run(load_async(predictor)), quiet, reset=reset,
+                h2h=lambda predictor, _: list(predictor.prefetched_h2h.values())
+            ))
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'settings': {
+            'fixtures': args.fixtures or 'synthetic',
+            'league': args.league,
+            'repeat': args.repeat,
+            'api_latency': args.api_latency,
+            'llm_latency': args.llm_latency,
+            'rate_limit': args.rate_limit,
+            'workers': args.workers,
+            'engine': args.engine,
+            'warm_cache': args.warm_cache,
+        },
+        'benchmarks': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
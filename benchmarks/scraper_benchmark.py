@@ -0,0 +1,107 @@
+"""Per-page H2H extraction latency on saved pages served from a local web server.
+
+Compares the original element-by-element scan with the single
+execute_script extraction, on the same warm browser.
+
+    python benchmarks/scraper_benchmark.py --pages saved_pages/
+    python benchmarks/scraper_benchmark.py --generate 10 --output results.json
+"""
+import argparse
+import functools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from football_scraper import DriverPool, extract_head_to_head, scan_head_to_head
+from h2h_corpus import generate_pages
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory):
+    """Serve directory over HTTP on a free local port; returns the server (call shutdown())"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def summarize(latencies):
+    return {
+        'mean': round(statistics.mean(latencies), 4),
+        'median': round(statistics.median(latencies), 4),
+        'max': round(max(latencies), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark H2H extraction on saved Sofascore pages")
+    parser.add_argument('--pages', help="Directory of saved .html pages (default: generate synthetic ones)")
+    parser.add_argument('--generate', type=int, default=10, help="Synthetic pages to generate when --pages is not given")
+    parser.add_argument('--filler', type=int, default=2000, help="Filler rows per synthetic page (DOM size)")
+    parser.add_argument('--skip-legacy', action='store_true', help="Only time the execute_script extraction")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.pages:
+        directory = args.pages
+        names = sorted(name for name in os.listdir(directory) if name.endswith('.html'))
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        directory = temp_dir.name
+        names = generate_pages(directory, args.generate, filler=args.filler)
+
+    server = serve(directory)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    pages = []
+    try:
+        with DriverPool(size=1) as pool, pool.driver() as driver:
+            for name in names:
+                _, load = timed(driver.get, f"{base_url}/{name}")
+                fast, fast_time = timed(extract_head_to_head, driver)
+                page = {'page': name, 'load': round(load, 4), 'execute_script': round(fast_time, 4),
+                        'chars': len(fast or '')}
+                if not args.skip_legacy:
+                    legacy, legacy_time = timed(scan_head_to_head, driver)
+                    page['element_scan'] = round(legacy_time, 4)
+                    page['same_text'] = (legacy or '').strip() == (fast or '').strip()
+                pages.append(page)
+                print(f"{name}: load {page['load']}s, execute_script {page['execute_script']}s"
+                      + (f", element scan {page['element_scan']}s" if 'element_scan' in page else ''))
+    finally:
+        server.shutdown()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    results = {
+        'pages': pages,
+        'execute_script': summarize([p['execute_script'] for p in pages]),
+    }
+    if not args.skip_legacy:
+        results['element_scan'] = summarize([p['element_scan'] for p in pages])
+        results['speedup'] = round(results['element_scan']['mean'] / max(results['execute_script']['mean'], 1e-9), 1)
+    print(json.dumps({k: v for k, v in results.items() if k != 'pages'}, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Import-time benchmark for the entry points.
+
+Each module is imported in a fresh interpreter several times and the median
+wall time is reported next to a bare `python -c pass`. One extra run with
+`-X importtime` gives the heaviest imports underneath it. The benchmark
+also lists any heavy optional dependency (openai, pandas, tabulate,
+selenium, ...) that was loaded by the import alone, which should never
+happen, since they are only imported on the code paths that use them.
+
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --repeat 10 --output startup_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = [
+    'match_predictor', 'match_analyzer', 'batch_predict', 'league_pipeline',
+    'football_scraper', 'match_store', 'tracing',
+]
+
+# Only imported on the code paths that need them
+HEAVY_MODULES = ['openai', 'dotenv', 'pandas', 'tabulate', 'selenium', 'webdriver_manager', 'http.server']
+
+REPORT_HEAVY = (
+    "import sys; print(','.join(m for m in {modules!r} if m in sys.modules))"
+)
+
+
+def wall_time(code, repeat):
+    """Median seconds to start an interpreter and run code"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def import_profile(module, top):
+    """(cumulative import microseconds, heaviest nested imports, heavy modules loaded) from -X importtime"""
+    code = f"import {module}; " + REPORT_HEAVY.format(modules=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_DIR, check=True,
+                            capture_output=True, text=True)
+    entries = []
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # two spaces per nesting level
+        name = name.strip()
+        if depth == 0 and name == module:
+            total = int(cumulative)
+        elif depth == 1:
+            entries.append((name, int(cumulative)))
+    entries.sort(key=lambda entry: -entry[1])
+    loaded = [m for m in result.stdout.strip().split(',') if m]
+    return total, entries[:top], loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long each entry point takes to import")
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS, help="Modules to import (default: the entry points)")
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument('--top', type=int, default=5, help="Heaviest direct imports listed per module")
+    parser.add_argument('--output', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    baseline = wall_time('pass', args.repeat)
+    print(f"{'python -c pass':20s} {baseline * 1000:7.1f} ms")
+    results = []
+    for module in args.modules:
+        seconds = wall_time(f"import {module}", args.repeat)
+        total, heaviest, loaded = import_profile(module, args.top)
+        results.append({
+            'module': module,
+            'median_ms': round(seconds * 1000, 1),
+            'over_baseline_ms': round((seconds - baseline) * 1000, 1),
+            'import_ms': round(total / 1000, 1),
+            'heaviest_imports_ms': {name: round(us / 1000, 1) for name, us in heaviest},
+            'heavy_modules_loaded': loaded,
+        })
+        breakdown = ', '.join(f"{name} {us / 1000:.0f}" for name, us in heaviest)
+        warning = f"  (loaded: {', '.join(loaded)})" if loaded else ''
+        print(f"{module:20s} {seconds * 1000:7.1f} ms  (+{(seconds - baseline) * 1000:.1f}; {breakdown}){warning}")
+
+    if args.output:
+        report = {
+            'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'python': platform.python_version(),
+            'baseline_ms': round(baseline * 1000, 1),
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Local stand-in for football-data.org and the OpenAI chat API.
+
+football-data requests are answered from recorded JSON files: a request for
+/v4/competitions/2021/matches?status=FINISHED is served from
+<fixtures>/competitions/2021/matches.json, with the status and limit
+filters applied to its "matches". Chat completion requests get canned
+bullet-point (or JSON batch) answers after a configurable delay. Every
+request is counted per endpoint so benchmarks can report call counts.
+
+    python benchmarks/stub_server.py --fixtures DIR --port 8765 --llm-latency 0.5
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+FIXTURE_HEADER = re.compile(r'### Fixture (\d+):')
+
+
+def endpoint_name(path):
+    """/v4/teams/57/matches -> /teams/{id}/matches"""
+    return ID_SEGMENT.sub('/{id}', re.sub(r'^/v4', '', path))
+
+
+def filter_matches(body, query):
+    """Apply the API's status and limit filters to a recorded listing"""
+    matches = body.get('matches')
+    if matches is None:
+        return body
+    statuses = query.get('status', [''])[0]
+    if statuses:
+        wanted = set(statuses.split(','))
+        matches = [m for m in matches if m.get('status') in wanted]
+    limit = query.get('limit', [''])[0]
+    if limit.isdigit():
+        matches = matches[:int(limit)]
+    return {**body, 'matches': matches}
+
+
+def chat_answer(request):
+    """Canned predictions in the shape the client asked for"""
+    prompt = request['messages'][-1]['content']
+    if request.get('response_format', {}).get('type') == 'json_object':
+        fixtures = [
+            {'id': int(i), 'predictions': ['Home team to score', 'Over 1.5 goals', 'Both teams to score']}
+            for i in FIXTURE_HEADER.findall(prompt)
+        ]
+        content = json.dumps({'fixtures': fixtures})
+    else:
+        content = "- Home team to score\n- Over 1.5 goals\n- Both teams to score"
+    prompt_tokens = sum(len(m['content']) for m in request['messages']) // 4
+    return {
+        'id': 'chatcmpl-stub',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request.get('model', 'stub'),
+        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': len(content) // 4,
+            'total_tokens': prompt_tokens + len(content) // 4,
+        },
+    }
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops connections when an async client opens many at once
+    request_queue_size = 256
+
+
+class StubServer:
+    """Threaded stub server; use as a context manager or call start()/stop()"""
+
+    def __init__(self, fixtures_dir, port=0, api_latency=0.0, llm_latency=0.0):
+        self.fixtures_dir = fixtures_dir
+        self.api_latency = api_latency
+        self.llm_latency = llm_latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.httpd = StubHTTPServer(('127.0.0.1', port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def count(self, name):
+        with self.lock:
+            self.calls[name] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.calls)
+
+    def reset(self):
+        with self.lock:
+            self.calls.clear()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                server.count(endpoint_name(url.path))
+                if server.api_latency:
+                    time.sleep(server.api_latency)
+
+                relative = re.sub(r'^/v4', '', url.path).strip('/')
+                path = os.path.join(server.fixtures_dir, relative + '.json')
+                if not relative or not os.path.isfile(path):
+                    self.send_json(404, {'message': f"No recorded response for {url.path}", 'errorCode': 404})
+                    return
+                with open(path, encoding='utf-8') as f:
+                    body = json.load(f)
+                self.send_json(200, filter_matches(body, parse_qs(url.query)))
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if not url.path.endswith('/chat/completions'):
+                    self.send_json(404, {'error': {'message': 'unknown endpoint'}})
+                    return
+                server.count('openai:/chat/completions')
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length))
+                if server.llm_latency:
+                    time.sleep(server.llm_latency)
+                self.send_json(200, chat_answer(request))
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded football-data responses and a stub OpenAI API")
+    parser.add_argument('--fixtures', required=True, help="Directory of recorded responses (see record_fixtures.py)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--api-latency', type=float, default=0.0, help="Seconds added to every football-data response")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Seconds added to every chat completion")
+    args = parser.parse_args()
+
+    server = StubServer(args.fixtures, args.port, args.api_latency, args.llm_latency)
+    print(f"Serving {args.fixtures} on {server.url}/v4 (OpenAI stub at {server.url}/v1)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+
+# Location of the on-disk response cache (override with FOOTBALL_CACHE_PATH)
+CACHE_PATH = os.getenv('FOOTBALL_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.football_cache.sqlite'))
+
+# Time-to-live per endpoint class, in seconds
+TTL_TEAMS = 3 * 24 * 60 * 60       # team lists barely change during a season
+TTL_FINISHED = 24 * 60 * 60        # finished results, also dropped when a new matchday starts
+TTL_SCHEDULED = 10 * 60            # fixtures move around (kick-off times, postponements)
+
+TEAMS_PATH = re.compile(r'/teams/?$')
+COMPETITION_MATCHES_PATH = re.compile(r'/competitions/([^/]+)/matches/?$')
+
+CLASS_TEAMS = 'teams'
+CLASS_FINISHED = 'finished'
+CLASS_SCHEDULED = 'scheduled'
+
+ENDPOINT_TTLS = {
+    CLASS_TEAMS: TTL_TEAMS,
+    CLASS_FINISHED: TTL_FINISHED,
+    CLASS_SCHEDULED: TTL_SCHEDULED,
+}
+
+
+def endpoint_class(url, params=None):
+    """Classify a football-data.org URL so it gets the right TTL"""
+    params = params or {}
+    path = url.split('?')[0]
+
+    if TEAMS_PATH.search(path):
+        return CLASS_TEAMS
+    if path.endswith('/head2head') or params.get('status') == 'FINISHED':
+        return CLASS_FINISHED
+    return CLASS_SCHEDULED
+
+
+def make_key(url, params=None):
+    """Build a stable cache key from the URL and its query parameters"""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response when serving from the cache"""
+
+    def __init__(self, url, payload, status_code=200, from_cache=True):
+        self.url = url
+        self.status_code = status_code
+        self.from_cache = from_cache
+        self.headers = {}
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class ResponseCache:
+    """SQLite-backed store of JSON API responses with per-entry expiry"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint_class TEXT NOT NULL,
+                competition TEXT,
+                payload TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS matchdays (
+                competition TEXT PRIMARY KEY,
+                matchday INTEGER NOT NULL
+            )"""
+        )
+        self.conn.commit()
+
+    def get(self, key):
+        """Return the cached payload for a key, or None if missing or expired"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        payload, expires_at = row
+        if expires_at < time.time():
+            self.delete(key)
+            return None
+        return json.loads(payload)
+
+    def set(self, key, payload, ttl, endpoint_class=CLASS_SCHEDULED, competition=None):
+        """Store a payload for ttl seconds"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint_class, competition, payload, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint_class, competition, json.dumps(payload), time.time() + ttl)
+            )
+            self.conn.commit()
+
+    def delete(self, key):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def clear(self, endpoint_class=None):
+        """Drop every entry, or only those of one endpoint class"""
+        with self.lock:
+            if endpoint_class:
+                self.conn.execute("DELETE FROM responses WHERE endpoint_class = ?", (endpoint_class,))
+            else:
+                self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def purge_expired(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self.conn.commit()
+
+    def note_matchday(self, competition, matchday):
+        """Record the current matchday; finished-match history is dropped when it advances"""
+        if matchday is None:
+            return
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT matchday FROM matchdays WHERE competition = ?", (competition,)
+            ).fetchone()
+            if row and row[0] == matchday:
+                return
+            self.conn.execute(
+                "INSERT OR REPLACE INTO matchdays (competition, matchday) VALUES (?, ?)",
+                (competition, matchday)
+            )
+            if row:
+                # A new matchday has started, so team histories are stale
+                self.conn.execute("DELETE FROM responses WHERE endpoint_class = ?", (CLASS_FINISHED,))
+            self.conn.commit()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide response cache, or None if caching is disabled"""
+    global _default_cache
+    if os.getenv('FOOTBALL_CACHE_DISABLED'):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+    return _default_cache
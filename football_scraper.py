@@ -1,183 +1,469 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+# Selenium, webdriver_manager and the API client are imported inside the
+# functions that need them, so the parse-only path starts without them
+import argparse
+import atexit
+import os
+import queue
+import threading
 import time
 import csv
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
+from leagues import LEAGUE_IDS
+
+# Number of warm browsers kept by the default pool (override with SCRAPER_POOL_SIZE)
+POOL_SIZE = int(os.getenv('SCRAPER_POOL_SIZE', '1'))
+
+# Pages a browser serves before it is replaced with a fresh one (override with SCRAPER_RECYCLE_AFTER)
+RECYCLE_AFTER = int(os.getenv('SCRAPER_RECYCLE_AFTER', '50'))
+
+# Longest wait for a page element before giving up (override with SCRAPER_WAIT_TIMEOUT)
+WAIT_TIMEOUT = float(os.getenv('SCRAPER_WAIT_TIMEOUT', '10'))
+
+# Returns the Head-to-Head block of the page text (or null) in a single WebDriver round-trip
+H2H_EXTRACT_SCRIPT = """
+const text = ((document.body && document.body.innerText) || '').trim();
+const start = text.indexOf('Head-to-Head');
+if (start < 0) return null;
+return text.slice(start).split('*IMPORTANT NOTICE')[0];
+"""
+
+# Consolidated output of bulk scrapes and its list of finished pairs (override with H2H_DATASET_PATH)
+DATASET_PATH = os.getenv('H2H_DATASET_PATH', 'h2h_dataset.csv')
+
+# Competition headings recognised in Head-to-Head text (override with H2H_COMPETITIONS, comma separated)
+KNOWN_COMPETITIONS = frozenset(
+    name.strip() for name in os.getenv(
+        'H2H_COMPETITIONS',
+        'Premier League,FA Cup,EFL Cup,UEFA Champions League,Community Shield,UEFA Europa League,'
+        'UEFA Europa Conference League,LaLiga,Serie A,Bundesliga,Ligue 1,Eredivisie,Championship,Club Friendly Games'
+    ).split(',') if name.strip()
+)
+
+# Matches before this year end the parse (H2H lists run newest first)
+MIN_YEAR = 2020
+
+MATCH_STATUSES = frozenset(['FT', 'AP', 'AET', 'Postponed', 'Canceled'])
+DATE_PATTERN = re.compile(r'\d{2}/\d{2}/\d{2}$')
+KICKOFF_PATTERN = re.compile(r'\d{2}:\d{2}$')
+SCORE_PATTERN = re.compile(r'\d+(\s*\(\d+\))?$')
+
+# Tokenizer states
+_SEEK, _STATUS, _HOME, _AWAY, _SCORES = range(5)
+
+H2H_FIELDNAMES = ['date', 'competition', 'home_team', 'away_team', 'home_goals', 'away_goals']
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+def chromedriver_path():
+    """Install (or locate) chromedriver once per process"""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
+def create_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
 
-def setup_driver():
     options = webdriver.ChromeOptions()
     options.add_argument('--headless')  # Run Chrome in headless mode
     options.add_argument('--disable-gpu')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
+    return webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+
+def driver_is_healthy(driver):
+    """Cheap round-trip to check the browser session is still alive"""
+    from selenium.common.exceptions import WebDriverException
     try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        driver.execute_script("return 1")
+        return True
+    except WebDriverException:
+        return False
+
+class DriverPool:
+    """A fixed set of warm headless browsers handed out to scrape jobs.
+
+    Browsers are started once (in parallel) and reused. A browser that fails
+    its health check or raises a WebDriverException is discarded, and every
+    browser is replaced after recycle_after pages so long jobs don't
+    accumulate memory. Replacements start lazily on the next checkout.
+
+        with DriverPool(size=4) as pool:
+            with pool.driver() as driver:
+                driver.get(url)
+    """
+
+    def __init__(self, size=POOL_SIZE, recycle_after=RECYCLE_AFTER):
+        self.size = max(1, size)
+        self.recycle_after = recycle_after
+        self.idle = queue.Queue()
+        self.pages = {}  # id(driver) -> pages served
+        self.lock = threading.Lock()
+        self.started = 0
+        self.recycled = 0
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for driver in executor.map(lambda _: self._start(), range(self.size)):
+                self.idle.put(driver)
+
+    def _start(self):
+        driver = create_driver()
+        with self.lock:
+            self.pages[id(driver)] = 0
+            self.started += 1
         return driver
-    except Exception as e:
-        print("Error setting up Chrome webdriver:", str(e))
-        exit(1)
 
-def parse_head_to_head_data(raw_data):
-    lines = raw_data.split('\n')
-    matches = []
+    def _discard(self, driver):
+        from selenium.common.exceptions import WebDriverException
+        with self.lock:
+            self.pages.pop(id(driver), None)
+            self.recycled += 1
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    @contextmanager
+    def driver(self):
+        """Check out a healthy browser for one page; it goes back to the pool afterwards"""
+        from selenium.common.exceptions import WebDriverException
+        driver = self.idle.get()
+        if driver is not None and not driver_is_healthy(driver):
+            self._discard(driver)
+            driver = None
+        try:
+            if driver is None:
+                driver = self._start()
+        except Exception:
+            self.idle.put(None)  # keep the slot so a later checkout can retry
+            raise
+
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = not driver_is_healthy(driver)
+            raise
+        finally:
+            with self.lock:
+                self.pages[id(driver)] = self.pages.get(id(driver), 0) + 1
+                worn_out = self.pages[id(driver)] >= self.recycle_after
+            if broken or worn_out:
+                self._discard(driver)
+                driver = None
+            self.idle.put(driver)
+
+    def stats(self):
+        with self.lock:
+            return {'size': self.size, 'started': self.started, 'recycled': self.recycled}
+
+    def close(self):
+        from selenium.common.exceptions import WebDriverException
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                try:
+                    driver.quit()
+                except WebDriverException:
+                    pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_driver_pool():
+    """Return the process-wide browser pool, starting it on first use"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = DriverPool()
+            atexit.register(_default_pool.close)
+    return _default_pool
+
+def valid_date_year(date_str):
+    """Year of a dd/mm/yy date, or None if it is not a real date (memoized: H2H dumps repeat dates)"""
+    year = _date_years.get(date_str)
+    if year is None and date_str not in _date_years:
+        try:
+            year = datetime.strptime(date_str, '%d/%m/%y').year
+        except ValueError:
+            year = None
+        _date_years[date_str] = year
+    return year
+
+_date_years = {}
+
+def _h2h_record(date, competition, home_team, away_team, scores):
+    if len(scores) >= 4:
+        home_goals, away_goals = scores[0], scores[2]  # goals interleaved with ratings
+    elif len(scores) >= 2:
+        home_goals, away_goals = scores[0], scores[1]
+    else:
+        # Handle cases where match is postponed or scores are not available
+        home_goals = away_goals = 'Postponed'
+    return {
+        'date': date,
+        'competition': competition,
+        'home_team': home_team,
+        'away_team': away_team,
+        'home_goals': home_goals,
+        'away_goals': away_goals,
+    }
+
+def iter_head_to_head(lines, competitions=KNOWN_COMPETITIONS, since_year=MIN_YEAR):
+    """Tokenize raw Head-to-Head text lines into match dicts in one pass.
+
+    lines can be any iterable (a list, a file, a generator); matches are
+    yielded as soon as their last line is read. A match is a dd/mm/yy date,
+    an optional status (FT, AP, Postponed or a kick-off time), the home and
+    away teams, then up to four score/rating lines. Lines naming one of
+    competitions set the competition for the matches that follow; headers
+    and any other unrecognised lines are ignored. Parsing stops at the first
+    match older than since_year (None parses everything).
+    """
     competition = ''
-    i = 0
-    
-    # Define a list of known competitions
-    known_competitions = ['Premier League', 'FA Cup', 'EFL Cup', 'UEFA Champions League', 'Community Shield']
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip irrelevant lines
-        if line in ['Head-to-Head', 'At Manchester United', 'This Tournament', 'Sofascore Ratings']:
-            i += 1
+    state = _SEEK
+    for line in lines:
+        line = line.strip()
+
+        if state == _SCORES:
+            if len(scores) < 4 and SCORE_PATTERN.match(line):
+                scores.append(line)
+                if len(scores) == 4:
+                    yield _h2h_record(date, competition, home_team, away_team, scores)
+                    state = _SEEK
+                continue
+            yield _h2h_record(date, competition, home_team, away_team, scores)
+            state = _SEEK  # this line starts something new
+
+        if state == _STATUS:
+            state = _HOME
+            if line in MATCH_STATUSES or KICKOFF_PATTERN.match(line):
+                continue
+        if state == _HOME:
+            home_team, state = line, _AWAY
             continue
-        
-        # Check if the line indicates a competition
-        if line in known_competitions:
-            competition = line
-            i += 1
+        if state == _AWAY:
+            away_team, state, scores = line, _SCORES, []
             continue
-        
-        # Check for date pattern (dd/mm/yy)
-        date_match = re.match(r'\d{2}/\d{2}/\d{2}', line)
-        if date_match:
-            date_str = line
-            try:
-                date_obj = datetime.strptime(date_str, '%d/%m/%y')
-                # **Modification starts here**
-                # Skip matches before 2020
-                if date_obj.year < 2020:
-                    break  # Exit the loop as we've reached matches before 2020
-                date = date_obj.strftime('%d/%m/%y')
-                # **Modification ends here**
-            except ValueError:
-                # If date format is incorrect, skip this line
-                i += 1
+
+        if line in competitions:
+            competition = line
+        elif DATE_PATTERN.match(line):
+            year = valid_date_year(line)
+            if year is None:
                 continue
-            
-            i += 1
-            # Check for match status (FT, AP, Postponed, 15:00)
-            status = lines[i].strip()
-            if status in ['FT', 'AP', 'Postponed', '15:00']:
-                match_status = status
-                i += 1
-            else:
-                match_status = ''
-            
-            # Get home and away teams
-            if i + 1 < len(lines):
-                home_team = lines[i].strip()
-                away_team = lines[i+1].strip()
-                i += 2
-            else:
-                break  # Not enough lines to parse teams
-            
-            # Initialize scores and ratings
-            home_goals = ''
-            away_goals = ''
-            home_rating = ''
-            away_rating = ''
-            
-            # Get scores and ratings if available
-            scores_collected = 0
-            scores_and_ratings = []
-            while i < len(lines) and scores_collected < 4:
-                score_line = lines[i].strip()
-                # Check if the line contains a number (could be score or rating)
-                if re.match(r'^\d+(\s*\(\d+\))?$', score_line):
-                    scores_and_ratings.append(score_line)
-                    scores_collected += 1
-                    i += 1
-                else:
-                    break  # No more scores/ratings available
-            
-            if len(scores_and_ratings) >= 4:
-                home_goals = scores_and_ratings[0]
-                home_rating = scores_and_ratings[1]
-                away_goals = scores_and_ratings[2]
-                away_rating = scores_and_ratings[3]
-            elif len(scores_and_ratings) >= 2:
-                home_goals = scores_and_ratings[0]
-                away_goals = scores_and_ratings[1]
-            else:
-                # Handle cases where match is postponed or scores are not available
-                home_goals = 'Postponed'
-                away_goals = 'Postponed'
-            
-            match = {
-                'date': date,
-                'competition': competition,
-                'home_team': home_team,
-                'away_team': away_team,
-                'home_goals': home_goals,
-                'away_goals': away_goals,
-                # 'home_rating': home_rating,  # Uncomment if you want to include ratings
-                # 'away_rating': away_rating   # Uncomment if you want to include ratings
-            }
-            matches.append(match)
-        else:
-            i += 1  # Move to the next line if no date is found
-
-    return matches
-
-def get_head_to_head_data(team1, team2):
-    driver = setup_driver()
-    time.sleep(2)  # Wait for the driver to be ready
+            if since_year is not None and year < since_year:
+                return  # matches are newest first, so everything after is older
+            date, state = line, _STATUS
+
+    if state == _SCORES:
+        yield _h2h_record(date, competition, home_team, away_team, scores)
+
+def parse_head_to_head_data(raw_data, competitions=KNOWN_COMPETITIONS, since_year=MIN_YEAR):
+    """Parse the raw Head-to-Head text scraped from Sofascore into a list of match dicts"""
+    return list(iter_head_to_head(raw_data.split('\n'), competitions, since_year))
+
+def get_head_to_head_data(team1, team2, pool=None):
+    """Scrape the raw Head-to-Head text for a pair on a warm browser from pool (default: the shared pool)"""
+    pool = pool or get_driver_pool()
+    try:
+        with pool.driver() as driver:
+            return scrape_head_to_head(driver, team1, team2)
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+        return str(e)
+
+def open_match_page(driver, team1, team2, timeout=WAIT_TIMEOUT):
+    """Search Google for the Sofascore page of a pair and open the first result"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get("https://www.google.com")
+    search_box = WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.NAME, "q")))
+    search_box.send_keys(f"{team1} vs {team2} sofascore")
+    search_box.send_keys(Keys.RETURN)
+    
+    # Click on the first result as soon as the results are there
+    first_result = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.CSS_SELECTOR, "div.g a")))
+    first_result.click()
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
     
+    # Scroll so the lazily rendered Head-to-Head section loads
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+
+def extract_head_to_head(driver, timeout=WAIT_TIMEOUT):
+    """Wait until the page shows a Head-to-Head block and return its text, or None on timeout"""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
-        # Go to Google and search
-        driver.get("https://www.google.com")
-        search_box = driver.find_element(By.NAME, "q")
-        search_box.send_keys(f"{team1} vs {team2} sofascore")
-        search_box.send_keys(Keys.RETURN)
-        time.sleep(2)
-        
-        # Click on the first result
-        first_result = driver.find_element(By.CSS_SELECTOR, "div.g a")
-        first_result.click()
-        time.sleep(2)
-        
-        # Scroll to load content
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-        time.sleep(2)
-        
-        # Find the Head-to-Head section
-        all_elements = driver.find_elements(By.CSS_SELECTOR, "*")
-        for element in all_elements:
-            text = element.text.strip()
-            if text and "Head-to-Head" in text:
-                start_index = text.index("Head-to-Head")
-                raw_data = text[start_index:]
-                # Remove any disclaimer or notes at the end
-                if "*IMPORTANT NOTICE" in raw_data:
-                    raw_data = raw_data.split("*IMPORTANT NOTICE")[0]
-                return raw_data
-            
-        return "No Head-to-Head data found"
+        return WebDriverWait(driver, timeout).until(lambda d: d.execute_script(H2H_EXTRACT_SCRIPT))
+    except TimeoutException:
+        return None
+
+def scan_head_to_head(driver):
+    """Original extraction: read .text from every element until one contains the block.
+
+    One WebDriver round-trip per element, so it is O(DOM size); kept for
+    comparison in benchmarks/scraper_benchmark.py.
+    """
+    from selenium.webdriver.common.by import By
+
+    all_elements = driver.find_elements(By.CSS_SELECTOR, "*")
+    for element in all_elements:
+        text = element.text.strip()
+        if text and "Head-to-Head" in text:
+            start_index = text.index("Head-to-Head")
+            raw_data = text[start_index:]
+            # Remove any disclaimer or notes at the end
+            if "*IMPORTANT NOTICE" in raw_data:
+                raw_data = raw_data.split("*IMPORTANT NOTICE")[0]
+            return raw_data
+    return None
+
+def scrape_head_to_head(driver, team1, team2, timeout=WAIT_TIMEOUT):
+    try:
+        open_match_page(driver, team1, team2, timeout)
+        return extract_head_to_head(driver, timeout) or "No Head-to-Head data found"
             
     except Exception as e:
         print(f"An error occurred: {str(e)}")
         return str(e)
-    finally:
-        driver.quit()
 
 def save_matches_to_csv(matches, team1, team2):
     if matches:
         filename = f"{team1.lower()}_{team2.lower()}_h2h.csv".replace(" ", "_")
         with open(filename, 'w', newline='', encoding='utf-8') as file:
-            fieldnames = ['date', 'competition', 'home_team', 'away_team', 'home_goals', 'away_goals']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer = csv.DictWriter(file, fieldnames=H2H_FIELDNAMES)
             writer.writeheader()
             writer.writerows(matches)
         print(f"Data saved to {filename}")
 
+def pair_key(team1, team2):
+    return f"{team1}|{team2}"
+
+def load_checkpoint(checkpoint_path):
+    """Pairs already scraped by an earlier (possibly interrupted) run"""
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, encoding='utf-8') as file:
+        return {line.rstrip('\n') for line in file if line.strip()}
+
+def fixture_pairs(fixtures):
+    """(home, away) team name pairs from fixture MatchRecords, e.g. fetch_upcoming_matches()"""
+    return [(match.home_name, match.away_name) for match in fixtures]
+
+def scrape_pair(pool, team1, team2):
+    """Scrape and parse one pair; returns (rows, error)"""
+    raw_data = get_head_to_head_data(team1, team2, pool)
+    if not raw_data.startswith("Head-to-Head"):
+        return [], raw_data
+    return parse_head_to_head_data(raw_data), None
+
+def scrape_pairs(pairs, dataset_path=DATASET_PATH, workers=POOL_SIZE, store=None):
+    """Scrape every pair on a pool of warm browsers into one CSV dataset.
+
+    Rows are appended to dataset_path (with team1/team2 columns naming the
+    pair they came from) as each pair finishes, and the pair is then recorded
+    in dataset_path + '.done'. Rerunning after a crash skips finished pairs;
+    pairs that failed are retried. Returns a summary dict.
+    """
+    checkpoint_path = dataset_path + '.done'
+    done = load_checkpoint(checkpoint_path)
+    pairs = list(dict.fromkeys(pairs))
+    todo = [pair for pair in pairs if pair_key(*pair) not in done]
+    print(f"{len(todo)} pair(s) to scrape, {len(pairs) - len(todo)} already done")
+
+    summary = {'pairs': len(todo), 'scraped': 0, 'failed': 0, 'rows': 0, 'seconds': 0.0, 'pairs_per_minute': 0.0}
+    if not todo:
+        return summary
+
+    write_header = not os.path.exists(dataset_path) or os.path.getsize(dataset_path) == 0
+    start = time.perf_counter()
+    with open(dataset_path, 'a', newline='', encoding='utf-8') as dataset, \
+            open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+            DriverPool(size=min(workers, len(todo))) as pool, \
+            ThreadPoolExecutor(max_workers=pool.size) as executor:
+        writer = csv.DictWriter(dataset, fieldnames=['team1', 'team2'] + H2H_FIELDNAMES)
+        if write_header:
+            writer.writeheader()
+
+        futures = {executor.submit(scrape_pair, pool, team1, team2): (team1, team2) for team1, team2 in todo}
+        for future in as_completed(futures):
+            team1, team2 = futures[future]
+            rows, error = future.result()
+            if error:
+                summary['failed'] += 1
+                print(f"Failed: {team1} vs {team2} ({error})")
+                continue
+
+            writer.writerows({'team1': team1, 'team2': team2, **row} for row in rows)
+            dataset.flush()
+            checkpoint.write(pair_key(team1, team2) + '\n')
+            checkpoint.flush()
+            if store is not None and rows:
+                store.save_scraped(rows)
+
+            summary['scraped'] += 1
+            summary['rows'] += len(rows)
+            elapsed = time.perf_counter() - start
+            print(f"[{summary['scraped'] + summary['failed']}/{len(todo)}] {team1} vs {team2}: {len(rows)} match(es), "
+                  f"{summary['scraped'] / elapsed * 60:.1f} pairs/min")
+
+    elapsed = time.perf_counter() - start
+    summary['seconds'] = round(elapsed, 2)
+    summary['pairs_per_minute'] = round(summary['scraped'] / elapsed * 60, 2)
+    return summary
+
+def bulk_main(args):
+    from get_teams import fetch_upcoming_matches
+    from match_store import MatchStore
+
+    pairs = []
+    for league_name in args.league or []:
+        if league_name not in LEAGUE_IDS:
+            print(f"Unknown league: {league_name}")
+            continue
+        pairs += fixture_pairs(fetch_upcoming_matches(LEAGUE_IDS[league_name], os.getenv('FOOTBALL_DATA_API_KEY')))
+    if args.pairs:
+        with open(args.pairs, newline='', encoding='utf-8') as file:
+            pairs += [(row[0].strip(), row[1].strip()) for row in csv.reader(file) if len(row) >= 2]
+
+    summary = scrape_pairs(pairs, args.output, args.workers, MatchStore())
+    print(f"\nScraped {summary['scraped']} pair(s) ({summary['rows']} matches), {summary['failed']} failed, "
+          f"in {summary['seconds']}s: {summary['pairs_per_minute']} pairs/min")
+    print(f"Dataset: {args.output}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Scrape Sofascore head-to-head history")
+    parser.add_argument('--league', action='append', help="Scrape every upcoming fixture of this league (repeatable)")
+    parser.add_argument('--pairs', help="CSV file of team1,team2 pairs to scrape")
+    parser.add_argument('--workers', type=int, default=max(POOL_SIZE, 4), help="Browsers scraping in parallel")
+    parser.add_argument('--output', default=DATASET_PATH, help="Consolidated CSV dataset to append to")
+    args = parser.parse_args()
+
+    # Without a bulk source, scrape a single pair interactively
+    if args.league or args.pairs:
+        bulk_main(args)
+        return
+
     team1 = input("Enter first team name: ")
     team2 = input("Enter second team name: ")
     
@@ -210,5 +496,10 @@ def main():
     # Save to CSV
     save_matches_to_csv(matches, team1, team2)
     
+    # Keep the rows in the local match warehouse as well
+    if matches:
+        from match_store import MatchStore
+        MatchStore().save_scraped(matches)
+    
 if __name__ == "__main__":
     main()
@@ -0,0 +1,119 @@
+import numpy as np
+
+from match_record import played_columns
+
+# Number of most recent matches used for the rolling form line
+FORM_LENGTH = 5
+
+RESULT_CODES = np.array(['L', 'D', 'W'])
+
+
+class FormTable:
+    """Columnar form statistics for every team in a set of matches.
+
+    All per-team numbers (records, goals, clean sheets, BTTS / over 2.5 rates,
+    home/away splits and last-N form) are computed in one vectorized pass with
+    np.bincount, so building features for a whole league costs the same as a
+    handful of array operations regardless of how many teams it has.
+    """
+
+    def __init__(self, home_ids, away_ids, home_goals, away_goals, timestamps, form_length=FORM_LENGTH):
+        self.form_length = form_length
+        self.home_ids = np.asarray(home_ids, dtype=np.int64)
+        self.away_ids = np.asarray(away_ids, dtype=np.int64)
+        self.home_goals = np.asarray(home_goals, dtype=np.int64)
+        self.away_goals = np.asarray(away_goals, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        self._compute()
+
+    @classmethod
+    def from_matches(cls, matches, form_length=FORM_LENGTH):
+        """Build from MatchRecords, skipping unplayed ones and duplicate match IDs"""
+        return cls(*played_columns(matches), form_length=form_length)
+
+    def _compute(self):
+        n = len(self.home_ids)
+
+        # Long format: one row per (team, match), home rows first
+        team_ids = np.concatenate([self.home_ids, self.away_ids])
+        goals_for = np.concatenate([self.home_goals, self.away_goals])
+        goals_against = np.concatenate([self.away_goals, self.home_goals])
+        is_home = np.concatenate([np.ones(n, dtype=bool), np.zeros(n, dtype=bool)])
+        timestamps = np.concatenate([self.timestamps, self.timestamps])
+
+        self.team_ids, team_index = np.unique(team_ids, return_inverse=True)
+        self.positions = {int(team_id): i for i, team_id in enumerate(self.team_ids)}
+        size = len(self.team_ids)
+
+        def count(mask):
+            return np.bincount(team_index, weights=mask, minlength=size).astype(np.int64)
+
+        result = np.sign(goals_for - goals_against)  # -1 loss, 0 draw, 1 win
+        win, draw, loss = result == 1, result == 0, result == -1
+
+        self.played = np.bincount(team_index, minlength=size)
+        self.wins = count(win)
+        self.draws = count(draw)
+        self.losses = count(loss)
+        self.goals_for = count(goals_for)
+        self.goals_against = count(goals_against)
+        self.clean_sheets = count(goals_against == 0)
+        self.btts = count((goals_for > 0) & (goals_against > 0))
+        self.over_2_5 = count(goals_for + goals_against > 2)
+
+        self.home_played = count(is_home)
+        self.home_wins = count(is_home & win)
+        self.home_draws = count(is_home & draw)
+        self.home_losses = count(is_home & loss)
+        self.away_played = self.played - self.home_played
+        self.away_wins = self.wins - self.home_wins
+        self.away_draws = self.draws - self.home_draws
+        self.away_losses = self.losses - self.home_losses
+
+        # Rolling last-N form: sort by team then newest first, keep the first N rows of each team
+        order = np.lexsort((-timestamps.astype(np.int64), team_index))
+        sorted_team = team_index[order]
+        starts = np.searchsorted(sorted_team, np.arange(size))
+        rank = np.arange(len(order)) - starts[sorted_team]
+        recent = order[rank < self.form_length]
+        recent_team = team_index[recent]
+
+        self.form_points = np.bincount(
+            recent_team, weights=np.where(win[recent], 3, np.where(draw[recent], 1, 0)), minlength=size
+        ).astype(np.int64)
+        self.form_played = np.bincount(recent_team, minlength=size)
+        # Per-team form strings, newest result first (recent is already grouped by team)
+        letters = RESULT_CODES[result[recent] + 1]
+        bounds = np.searchsorted(recent_team, np.arange(size + 1))
+        self.form = [''.join(letters[bounds[i]:bounds[i + 1]]) for i in range(size)]
+
+    @staticmethod
+    def _rate(count, total):
+        return round(float(count) / total * 100, 2) if total > 0 else 0
+
+    def summary(self, team_id):
+        """Summary dict for one team (same base keys the analyzer and predictor always used)"""
+        i = self.positions.get(int(team_id))
+        if i is None:
+            return None
+        played = int(self.played[i])
+        return {
+            'matches_played': played,
+            'wins': int(self.wins[i]),
+            'draws': int(self.draws[i]),
+            'losses': int(self.losses[i]),
+            'win_rate': self._rate(self.wins[i], played),
+            'goals_for': int(self.goals_for[i]),
+            'goals_against': int(self.goals_against[i]),
+            'clean_sheets': int(self.clean_sheets[i]),
+            'btts_rate': self._rate(self.btts[i], played),
+            'over_2_5_rate': self._rate(self.over_2_5[i], played),
+            'home_record': f"{self.home_wins[i]}W-{self.home_draws[i]}D-{self.home_losses[i]}L",
+            'away_record': f"{self.away_wins[i]}W-{self.away_draws[i]}D-{self.away_losses[i]}L",
+            'form': self.form[i],
+            'form_points': int(self.form_points[i]),
+        }
+
+    def summaries(self):
+        """Summaries for every team, keyed by team ID"""
+        return {int(team_id): self.summary(team_id) for team_id in self.team_ids}
@@ -1,78 +1,83 @@
 import requests
+from api_client import get_client
+from match_record import project
 from datetime import datetime, timedelta
 
-def fetch_upcoming_matches(competition_id, api_key):
-    # API endpoint and headers
-    base_url = f"http://api.football-data.org/v4/competitions/{competition_id}/matches"
-    headers = {
-        "X-Auth-Token": api_key
-    }
+def fetch_upcoming_matches(competition_id, api_key, date_from=None, date_to=None):
+    params = upcoming_params(date_from, date_to)
+    
+    print(f"\nQuerying matches from {params['dateFrom']} to {params['dateTo']}")
     
-    # Date range: Today to 30 days in the future (more reasonable window)
+    try:
+        # API request
+        response = get_client(api_key).get(f"/competitions/{competition_id}/matches", params=params)
+        return upcoming_from_response(response, params)
+    except Exception as e:
+        return report_upcoming_error(e)
+
+def upcoming_params(date_from=None, date_to=None):
+    # Date range (YYYY-MM-DD): defaults to today to 30 days in the future
     today = datetime.today()
-    future_date = today + timedelta(days=30)
+    date_from = date_from or today.strftime('%Y-%m-%d')
+    date_to = date_to or (today + timedelta(days=30)).strftime('%Y-%m-%d')
     
     # Query parameters
-    params = {
-        "dateFrom": today.strftime('%Y-%m-%d'),
-        "dateTo": future_date.strftime('%Y-%m-%d'),
+    return {
+        "dateFrom": date_from,
+        "dateTo": date_to,
         "status": "SCHEDULED"  # Only get scheduled matches
     }
+
+def upcoming_from_response(response, params):
+    """Scheduled matches from a competition matches response (shared with async_client)"""
+    # Handle common API errors
+    if response.status_code == 403:
+        print("\nAPI Error: Authentication failed. Please check your API key.")
+        print("Note: Some competitions might require a premium subscription.")
+        return []
+    elif response.status_code == 429:
+        print("\nAPI Error: Rate limit still exceeded after retrying. Please try again later.")
+        return []
     
-    print(f"\nQuerying matches from {params['dateFrom']} to {params['dateTo']}")
+    response.raise_for_status()  # Raise an error for other status codes
     
-    try:
-        # API request
-        response = requests.get(base_url, headers=headers, params=params)
-        
-        # Handle common API errors
-        if response.status_code == 403:
-            print("\nAPI Error: Authentication failed. Please check your API key.")
-            print("Note: Some competitions might require a premium subscription.")
-            return []
-        elif response.status_code == 429:
-            print("\nAPI Error: Rate limit exceeded. Please try again later.")
-            return []
-        
-        response.raise_for_status()  # Raise an error for other status codes
-        
-        # Process matches
-        data = response.json()
-        
-        # Debug API response
-        if 'error' in data:
-            error_msg = data.get('message', data['error'])
-            print(f"\nAPI Error: {error_msg}")
-            if 'subscription' in error_msg.lower():
-                print("Note: This competition might require a premium subscription.")
-            return []
-            
-        matches = data.get("matches", [])
-        competition_name = data.get("competition", {}).get("name", "Unknown")
-        
-        print(f"\nAPI Response Summary:")
-        print(f"Competition: {competition_name}")
-        print(f"Total matches found: {len(matches)}")
-        print(f"Date range: {params['dateFrom']} to {params['dateTo']}")
+    # Process matches
+    data = response.json()
+    
+    # Debug API response
+    if 'error' in data:
+        error_msg = data.get('message', data['error'])
+        print(f"\nAPI Error: {error_msg}")
+        if 'subscription' in error_msg.lower():
+            print("Note: This competition might require a premium subscription.")
+        return []
         
-        if not matches:
-            print("No upcoming matches found in this date range.")
-            return []
-            
-        return matches
+    matches = data.get("matches", [])
+    competition_name = data.get("competition", {}).get("name", "Unknown")
+    
+    print(f"\nAPI Response Summary:")
+    print(f"Competition: {competition_name}")
+    print(f"Total matches found: {len(matches)}")
+    print(f"Date range: {params['dateFrom']} to {params['dateTo']}")
     
-    except requests.exceptions.RequestException as e:
+    if not matches:
+        print("No upcoming matches found in this date range.")
+        return []
+        
+    return project(matches, data.get("competition"))
+
+def report_upcoming_error(e):
+    """Print a failed fixtures request the way fetch_upcoming_matches always has; returns []"""
+    if isinstance(e, requests.exceptions.RequestException):
         print(f"\nAPI Request Error: {str(e)}")
         if "Max retries exceeded" in str(e):
             print("Note: Please check your internet connection.")
-        return []
-    except ValueError as e:
+    elif isinstance(e, ValueError):
         print(f"\nJSON Parsing Error: {str(e)}")
         print("Note: The API response was not in the expected format.")
-        return []
-    except Exception as e:
+    else:
         print(f"\nUnexpected Error: {str(e)}")
-        return []
+    return []
 
 # Example usage (only if run directly)
 if __name__ == "__main__":
@@ -83,7 +88,4 @@ if __name__ == "__main__":
     if matches:
         print(f"Upcoming matches for competition {competition_id}:")
         for match in matches:
-            home_team = match['homeTeam']['name']
-            away_team = match['awayTeam']['name']
-            match_date = match['utcDate']
-            print(f"{home_team} vs {away_team} on {match_date}")
+            print(f"{match.home_name} vs {match.away_name} on {match.kickoff:%Y-%m-%d %H:%M} UTC")
@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+import utils
+from api_client import get_client
+from leagues import LEAGUE_IDS
+from match_predictor import DEFAULT_ENGINE, DEFAULT_WORKERS, MatchPredictor, ordered_imap
+from prediction_llm import DEFAULT_CONCURRENCY, PredictionLLM
+
+# Leagues whose teams and fixtures are loaded at the same time
+DEFAULT_LEAGUE_WORKERS = 4
+
+
+class LeaguePipeline:
+    """Predict fixtures for many leagues in one run.
+
+    Every league gets its own MatchPredictor (teams, fixtures, form and
+    model), but they all share the process-wide API client, and with it the
+    response cache and the global rate limit. They also share the team
+    resolver, so Champions League teams resolve through the aliases already
+    learned from the domestic leagues, and one PredictionLLM, so the LLM
+    concurrency limit, token budget and prediction cache hold across the
+    whole run.
+
+    Leagues are loaded concurrently, then every league's fixtures go into
+    one work queue. The rate limiter decides the pace, so a slow league
+    never holds up the others.
+    """
+
+    def __init__(self, leagues=None, max_workers=DEFAULT_WORKERS, league_workers=DEFAULT_LEAGUE_WORKERS,
+                 engine=DEFAULT_ENGINE, store=None, llm_batch_size=1, date_from=None, date_to=None, **predictor_options):
+        self.leagues = list(leagues or LEAGUE_IDS)
+        self.max_workers = max_workers
+        self.league_workers = league_workers
+        self.date_from = date_from
+        self.date_to = date_to
+        self.predictor_options = dict(engine=engine, store=store, llm_batch_size=llm_batch_size, **predictor_options)
+        self.predictors = {}  # league name -> loaded MatchPredictor
+        self.llm = None
+        self.llm_lock = threading.Lock()
+        self.timings = {}
+
+    def shared_llm(self):
+        """The PredictionLLM every league's predictor uses, created on first call"""
+        with self.llm_lock:
+            if self.llm is None:
+                utils.load_env()
+                self.llm = PredictionLLM(concurrency=self.predictor_options.get('llm_concurrency', DEFAULT_CONCURRENCY),
+                                         token_budget=self.predictor_options.get('token_budget'))
+        return self.llm
+
+    def new_predictor(self):
+        return MatchPredictor(max_workers=self.max_workers, llm=self.shared_llm(), **self.predictor_options)
+
+    def load_league(self, league_name):
+        predictor = self.new_predictor()
+        with tracing.span('load_league', league=league_name):
+            loaded = predictor.fetch_league_fixtures(league_name, self.date_from, self.date_to)
+        if not loaded:
+            print(f"No upcoming matches found for {league_name}")
+            return league_name, None
+        return league_name, predictor
+
+    def load(self):
+        """Fetch teams, form and fixtures for every league concurrently"""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.league_workers, len(self.leagues)))) as executor:
+            for league_name, predictor in executor.map(self.load_league, self.leagues):
+                if predictor is not None:
+                    self.predictors[league_name] = predictor
+        self.timings['load'] = time.perf_counter() - start
+        return self.predictors
+
+    async def load_async(self, client=None):
+        """load() on one event loop: every league's requests, then every fixture's head-to-head, in flight together.
+
+        Afterwards iter_predictions() only has LLM calls left to make.
+        """
+        import asyncio
+        import async_client
+
+        start = time.perf_counter()
+        predictors = {league_name: self.new_predictor() for league_name in self.leagues}
+        async with async_client.client_or_new(client) as client:
+            loaded = await asyncio.gather(*(
+                predictor.fetch_league_fixtures_async(league_name, self.date_from, self.date_to, client)
+                for league_name, predictor in predictors.items()
+            ))
+            for (league_name, predictor), ok in zip(predictors.items(), loaded):
+                if ok:
+                    self.predictors[league_name] = predictor
+                else:
+                    print(f"No upcoming matches found for {league_name}")
+            await asyncio.gather(*(predictor.prefetch_async(client=client) for predictor in self.predictors.values()))
+        self.timings['load'] = time.perf_counter() - start
+        return self.predictors
+
+    def iter_predictions(self):
+        """Yield (league name, result) for every fixture of every loaded league.
+
+        All leagues' work units share one thread pool. Results come out league
+        by league in fixture order while later leagues are already being
+        worked on. Leagues are loaded first unless load() or load_async()
+        already ran, even if no league had fixtures.
+        """
+        if 'load' not in self.timings:
+            self.load()
+
+        start = time.perf_counter()
+        units = [
+            (league_name, predictor, unit)
+            for league_name, predictor in self.predictors.items()
+            for unit in predictor.work_units(predictor.fixtures)
+        ]
+
+        def run(task):
+            league_name, predictor, unit = task
+            return league_name, predictor.run_unit(unit)
+
+        if units:
+            workers = max(1, min(self.max_workers, len(units)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for league_name, results in ordered_imap(executor, run, units, workers * 2):
+                    for result in results:
+                        yield league_name, result
+        self.timings['predict'] = time.perf_counter() - start
+
+    def summary(self):
+        """Counts, timings and rate-limit statistics for the run"""
+        return {
+            'leagues': len(self.predictors),
+            'fixtures': sum(len(p.fixtures) for p in self.predictors.values()),
+            'load_seconds': round(self.timings.get('load', 0.0), 3),
+            'predict_seconds': round(self.timings.get('predict', 0.0), 3),
+            'api': get_client().rate_limiter.stats(),
+            'coalesced': get_client().single_flight.stats(),
+            'llm': self.llm.usage.summary() if self.llm is not None else None,
+        }
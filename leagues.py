@@ -0,0 +1,20 @@
+# Dictionary mapping leagues to their API IDs (Free Tier Only)
+LEAGUE_IDS = {
+    # Major European Leagues
+    "Premier League": "2021",
+    "La Liga": "2014",
+    "Bundesliga": "2002",
+    "Serie A": "2019",
+    "Ligue 1": "2015",
+    "Eredivisie": "2003",
+    "Championship": "2016",
+    "Primeira Liga": "2017",
+    
+    # Major Competitions
+    "Champions League": "2001",
+    "World Cup": "2000",
+    "European Championship": "2018",
+    
+    # Other Leagues
+    "Brasileirão Serie A": "2013"
+}
@@ -1,18 +1,27 @@
 import requests
+from api_client import get_client
+from pair_index import find_match_id
+from team_resolver import get_resolver
+from utils import (
+    H2H_HEADERS, HISTORY_HEADERS, get_stored_head_to_head, h2h_rows, history_rows, load_env, parse_head_to_head,
+    played_matches,
+)
+from match_record import project
+from match_store import MatchStore
+from form_stats import FormTable
+import metrics
+import tracing
 from datetime import datetime, timedelta
 import os
-from dotenv import load_dotenv
-import pandas as pd
-from tabulate import tabulate
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 class MatchAnalyzer:
-    def __init__(self):
+    def __init__(self, store=None):
         self.api_key = os.getenv('FOOTBALL_DATA_API_KEY')
-        self.base_url = 'http://api.football-data.org/v4'
-        self.headers = {'X-Auth-Token': self.api_key}
+        self.client = get_client(self.api_key)
+        self.store = store  # Optional MatchStore to read from instead of the API
         
         # Initialize with comprehensive Premier League team mappings
         self.team_ids = {
@@ -41,10 +50,9 @@ class MatchAnalyzer:
     def populate_team_ids(self):
         """Fetch and store Premier League team IDs from the API"""
         # Premier League competition ID is 2021
-        url = f"{self.base_url}/competitions/2021/teams"
-        
         try:
-            response = requests.get(url, headers=self.headers)
+            with tracing.span('teams', league=2021):
+                response = self.client.get("/competitions/2021/teams")
             response.raise_for_status()
             
             teams = response.json()['teams']
@@ -54,6 +62,7 @@ class MatchAnalyzer:
                 if team['shortName']:
                     self.team_ids[team['shortName'].lower()] = team['id']
                     
+            get_resolver().add_teams(teams)
             print(f"Loaded {len(teams)} Premier League team mappings")
             
         except requests.exceptions.RequestException as e:
@@ -70,27 +79,7 @@ class MatchAnalyzer:
 
     def get_team_id(self, team_name):
         """Get team ID with fuzzy matching fallback"""
-        team_name_lower = team_name.lower()
-        
-        # Direct match
-        if team_name_lower in self.team_ids:
-            return self.team_ids[team_name_lower]
-            
-        # Partial match
-        for known_name, team_id in self.team_ids.items():
-            if team_name_lower in known_name or known_name in team_name_lower:
-                return team_id
-                
-        # Fallback to API search if still no match
-        url = f"{self.base_url}/teams"
-        response = requests.get(url, headers=self.headers)
-        
-        if response.status_code == 200:
-            teams = response.json()['teams']
-            for team in teams:
-                if team_name.lower() in team['name'].lower():
-                    return team['id']
-        return None
+        return get_resolver(self.team_ids, 'match_analyzer').resolve(team_name, scope=set(self.team_ids.values()))
 
     def compare_teams(self, team1_name, team2_name):
         """Compare two teams' recent performances and head-to-head record"""
@@ -101,11 +90,14 @@ class MatchAnalyzer:
             return "One or both teams not found."
             
         # Get individual team analyses
-        team1_analysis = self.analyze_team(team1_id, team1_name)
-        team2_analysis = self.analyze_team(team2_id, team2_name)
+        with tracing.span('analyze_team', team=team1_id):
+            team1_analysis = self.analyze_team(team1_id, team1_name)
+        with tracing.span('analyze_team', team=team2_id):
+            team2_analysis = self.analyze_team(team2_id, team2_name)
         
         # Get head-to-head analysis
-        h2h_analysis = self.get_head_to_head(team1_id, team2_id)
+        with tracing.span('head_to_head', team1=team1_id, team2=team2_id):
+            h2h_analysis = self.get_head_to_head(team1_id, team2_id)
         
         return {
             'team1': team1_analysis,
@@ -115,149 +107,65 @@ class MatchAnalyzer:
 
     def analyze_team(self, team_id, team_name):
         """Show detailed match history and performance summary"""
-        matches = self.get_team_matches(team_id)
+        records = self.fetch_team_matches(team_id)
+        matches = played_matches(records)
         if not matches:
             return f"No matches found for {team_name}"
         
-        # Calculate basic stats
-        total_matches = len(matches)
-        wins = sum(1 for match in matches if match['result'] == 'W')
-        losses = sum(1 for match in matches if match['result'] == 'L')
-        draws = sum(1 for match in matches if match['result'] == 'D')
-        
         return {
+            'id': team_id,
             'name': team_name,
             'match_history': matches,
-            'summary': {
-                'matches_played': total_matches,
-                'wins': wins,
-                'draws': draws,
-                'losses': losses,
-                'win_rate': round((wins / total_matches * 100), 2) if total_matches > 0 else 0
-            }
+            'summary': FormTable.from_matches(records).summary(team_id)
         }
 
     def get_team_matches(self, team_id, days_back=90):
         """Get detailed match history for a team"""
+        return played_matches(self.fetch_team_matches(team_id, days_back))
+
+    def fetch_team_matches(self, team_id, days_back=90):
+        """Get a team's finished matches as MatchRecords from the store or the API"""
         date_from = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
         date_to = datetime.now().strftime('%Y-%m-%d')
         
-        url = f"{self.base_url}/teams/{team_id}/matches"
+        if self.store is not None:
+            tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+            return self.store.team_matches(team_id, date_from, tomorrow)
+        
         params = {
             'dateFrom': date_from,
             'dateTo': date_to,
             'status': 'FINISHED'
         }
         
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self.client.get(f"/teams/{team_id}/matches", params=params)
         
-        if response.status_code == 200:
-            matches = response.json()['matches']
-            match_history = []
-            
-            for match in matches:
-                # Get match details
-                date = datetime.strptime(match['utcDate'], '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d')
-                home_team = match['homeTeam']['name']
-                away_team = match['awayTeam']['name']
-                score = match['score']['fullTime']
-                competition = match['competition']['name']
-                
-                # Skip if no score (match not played)
-                if not score['home'] and not score['away']:
-                    continue
-                    
-                match_info = {
-                    'date': date,
-                    'competition': competition,
-                    'home_team': home_team,
-                    'away_team': away_team,
-                    'score': f"{score['home']} - {score['away']}",
-                    'result': self.get_result(match, team_id)
-                }
-                match_history.append(match_info)
-                
-            return match_history
-        return []
-
-    def get_result(self, match, team_id):
-        """Determine if the team won, lost, or drew the match"""
-        score = match['score']['fullTime']
-        is_home = match['homeTeam']['id'] == team_id
-        
-        team_score = score['home'] if is_home else score['away']
-        opponent_score = score['away'] if is_home else score['home']
-        
-        if team_score > opponent_score:
-            return 'W'
-        elif team_score < opponent_score:
-            return 'L'
-        else:
-            return 'D'
+        if response.status_code != 200:
+            return []
+        return project(response.json()['matches'])
 
     def get_head_to_head(self, team1_id, team2_id):
         """Get head to head matches between two teams"""
-        # Get matches for team1
-        url = f"{self.base_url}/teams/{team1_id}/matches"
-        params = {
-            'status': 'FINISHED',
-            'limit': 200  # Increase limit to find matches
-        }
+        if self.store is not None:
+            return get_stored_head_to_head(self.store, team1_id, team2_id)
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()  # Raise exception for bad status codes
-            
-            matches = response.json()['matches']
-            match_id = None
-            
-            # Find a match between these two teams
-            for match in matches:
-                if (match['homeTeam'].get('id') == team2_id or 
-                    match['awayTeam'].get('id') == team2_id):
-                    match_id = match['id']
-                    break
+            # Known pairs are looked up in the index; otherwise team1's history is scanned
+            with tracing.span('h2h_match_id', team1=team1_id, team2=team2_id):
+                match_id = find_match_id(self.client, team1_id, team2_id)
             
             if not match_id:
                 print(f"No matches found between teams {team1_id} and {team2_id}")
                 return None
             
             # Get head to head data using the match ID
-            url = f"{self.base_url}/matches/{match_id}/head2head"
             params = {'limit': 60}  # Get up to 50 previous matches
             
-            response = requests.get(url, headers=self.headers, params=params)
+            with tracing.span('h2h_fetch', match=match_id, team1=team1_id, team2=team2_id):
+                response = self.client.get(f"/matches/{match_id}/head2head", params=params)
             response.raise_for_status()
             
-            h2h_data = response.json()
-            
-            # Process the head to head data
-            matches = []
-            for match in h2h_data['matches']:
-                match_info = {
-                    'date': datetime.strptime(match['utcDate'], '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d'),
-                    'competition': match['competition']['name'],
-                    'home_team': match['homeTeam']['name'],
-                    'away_team': match['awayTeam']['name'],
-                    'score': f"{match['score']['fullTime']['home']} - {match['score']['fullTime']['away']}",
-                    'venue': match.get('venue', 'Unknown')
-                }
-                matches.append(match_info)
-            
-            # Get aggregate stats
-            agg = h2h_data['aggregates']
-            stats = {
-                'total_matches': agg['numberOfMatches'],
-                'total_goals': agg['totalGoals'],
-                'team1_wins': agg['homeTeam']['wins'] if agg['homeTeam']['id'] == team1_id else agg['awayTeam']['wins'],
-                'team2_wins': agg['homeTeam']['wins'] if agg['homeTeam']['id'] == team2_id else agg['awayTeam']['wins'],
-                'draws': agg['homeTeam']['draws']  # draws are same for both teams
-            }
-            
-            return {
-                'matches': matches,
-                'stats': stats
-            }
+            return parse_head_to_head(response.json(), team1_id, team2_id)
             
         except requests.exceptions.RequestException as e:
             print(f"API Error: {str(e)}")
@@ -267,7 +175,10 @@ class MatchAnalyzer:
             return None
 
 def main():
-    analyzer = MatchAnalyzer()
+    from tabulate import tabulate  # only needed to print the tables
+
+    # USE_MATCH_STORE=1 reads everything from the local warehouse (see match_store.py sync)
+    analyzer = MatchAnalyzer(store=MatchStore() if os.getenv('USE_MATCH_STORE') else None)
     
     # Get team names from user
     team1_name = input("Enter first team name: ")
@@ -291,11 +202,13 @@ def main():
         print(f"Last {summary['matches_played']} matches:")
         print(f"Record: {summary['wins']}W-{summary['draws']}D-{summary['losses']}L")
         print(f"Win Rate: {summary['win_rate']}%")
+        print(f"Goals: {summary['goals_for']} scored, {summary['goals_against']} conceded ({summary['clean_sheets']} clean sheets)")
+        print(f"BTTS: {summary['btts_rate']}% | Over 2.5: {summary['over_2_5_rate']}%")
+        print(f"Home: {summary['home_record']} | Away: {summary['away_record']} | Form: {summary['form']}")
         
         # Display match history in table format
         print("\nDetailed Match History:")
-        matches_df = pd.DataFrame(team_data['match_history'])
-        print(tabulate(matches_df, headers='keys', tablefmt='grid', showindex=False))
+        print(tabulate(history_rows(team_data['match_history'], team_data['id']), headers=HISTORY_HEADERS, tablefmt='grid'))
         print("\n")
     
     # Display head-to-head results
@@ -312,10 +225,11 @@ def main():
         print(f"Draws: {stats['draws']}")
         
         print("\nRecent Head-to-Head Matches:")
-        h2h_df = pd.DataFrame(h2h['matches'])
-        print(tabulate(h2h_df, headers='keys', tablefmt='grid', showindex=False))
+        print(tabulate(h2h_rows(h2h['matches']), headers=H2H_HEADERS, tablefmt='grid'))
     else:
         print("\nNo head-to-head data available for these teams")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    metrics.export()
+    tracing.export()
\ No newline at end of file
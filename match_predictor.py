@@ -1,33 +1,20 @@
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
 import utils
-from datetime import datetime
+import metrics
+import tracing
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from get_teams import fetch_upcoming_matches
 from teams import get_teams
+from leagues import LEAGUE_IDS
+from team_resolver import get_resolver
+from match_store import MatchStore, UPCOMING_STATUSES
+from form_stats import FormTable
+from prediction_llm import DEFAULT_CONCURRENCY, PredictionLLM
+from poisson_model import PoissonModel, describe_markets, model_predictions
 from difflib import get_close_matches
 
-# Dictionary mapping leagues to their API IDs (Free Tier Only)
-LEAGUE_IDS = {
-    # Major European Leagues
-    "Premier League": "2021",
-    "La Liga": "2014",
-    "Bundesliga": "2002",
-    "Serie A": "2019",
-    "Ligue 1": "2015",
-    "Eredivisie": "2003",
-    "Championship": "2016",
-    "Primeira Liga": "2017",
-    
-    # Major Competitions
-    "Champions League": "2001",
-    "World Cup": "2000",
-    "European Championship": "2018",
-    
-    # Other Leagues
-    "Brasileirão Serie A": "2013"
-}
-
 def find_closest_league(input_name, leagues):
     """Find the closest matching league name using fuzzy matching"""
     # Convert input and league names to lowercase for comparison
@@ -68,18 +55,62 @@ def find_closest_league(input_name, leagues):
     
     return None
 
+def ordered_imap(executor, fn, items, window):
+    """Lazily map fn over items on executor, yielding results in input order.
+
+    At most window calls are queued or running at once, so memory stays flat
+    however many items there are, and the first result is yielded as soon as
+    it is done while later ones are still running.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+# Default number of fixtures analyzed in parallel (override with PREDICTOR_WORKERS)
+DEFAULT_WORKERS = int(os.getenv('PREDICTOR_WORKERS', '4'))
+
+# Prediction engines: 'gpt' asks the LLM, 'poisson' uses the local Dixon-Coles model only,
+# 'hybrid' adds the model's probabilities to the LLM prompt (override with PREDICTION_ENGINE)
+ENGINES = ('gpt', 'poisson', 'hybrid')
+DEFAULT_ENGINE = os.getenv('PREDICTION_ENGINE', 'gpt')
+
+# Days of league history the Poisson model is fitted on (override with MODEL_HISTORY_DAYS)
+MODEL_HISTORY_DAYS = int(os.getenv('MODEL_HISTORY_DAYS', '365'))
+
 class MatchPredictor:
-    def __init__(self):
-        load_dotenv()
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    def __init__(self, max_workers=DEFAULT_WORKERS, bulk_form=True, include_cups=False, store=None,
+                 llm_batch_size=1, llm_concurrency=DEFAULT_CONCURRENCY, token_budget=None,
+                 engine=DEFAULT_ENGINE, llm=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown prediction engine '{engine}' (choose from {', '.join(ENGINES)})")
+        utils.load_env()
+        # Pass llm to share one PredictionLLM (concurrency limit, token budget, usage) between predictors.
+        # Its OpenAI client is created on the first request, so the poisson engine runs without an OpenAI key
+        self.llm = llm or PredictionLLM(concurrency=llm_concurrency, token_budget=token_budget)
+        self.llm_batch_size = llm_batch_size  # Fixtures packed into one LLM request (1 = one request each)
         self.football_api_key = os.getenv('FOOTBALL_DATA_API_KEY')
         self.current_league = None
-        self.fixtures = []
+        self.fixtures = []  # MatchRecords of the upcoming fixtures
         self.current_batch_index = 0
         self.teams_data = {}  # Will store team IDs for current league
+        self.team_scope = None  # IDs of the current league's teams, to tell apart teams sharing an alias
+        self.max_workers = max_workers  # 1 = analyze fixtures one after another
+        self.bulk_form = bulk_form  # Derive team form from one league-wide fetch
+        self.include_cups = include_cups  # Fetch per-team history instead, to pick up cup matches
+        self.team_match_index = None  # team ID -> match history (MatchRecords), filled in bulk mode
+        self.form_table = None  # FormTable for the whole league, filled in bulk mode
+        self.store = store  # Optional MatchStore to read from instead of the API
+        self.engine = engine
+        self.model = None  # PoissonModel for the current league, fitted unless engine is 'gpt'
+        self.prefetched_h2h = {}  # (team1 ID, team2 ID) -> head-to-head, filled by prefetch_async
+        self.prefetched_history = {}  # team ID -> MatchRecords, filled by prefetch_async
 
-    def fetch_league_fixtures(self, league_name):
-        """Fetch all fixtures for a given league"""
+    def fetch_league_fixtures(self, league_name, date_from=None, date_to=None):
+        """Fetch all fixtures for a given league (dates are inclusive YYYY-MM-DD, default the next 30 days)"""
         if league_name not in LEAGUE_IDS:
             return False
         
@@ -87,35 +118,151 @@ class MatchPredictor:
         print(f"\nFetching teams for {league_name} (ID: {league_id})...")
         
         # First, fetch teams for this league
-        teams = get_teams(league_id, self.football_api_key)
+        with tracing.stage('teams', league=league_id):
+            if self.store is not None:
+                teams = self.store.competition_teams(league_id)
+            else:
+                teams = get_teams(league_id, self.football_api_key)
+        if not self.set_teams(league_name, teams):
+            return False
+        
+        # One call for the whole league's recent results instead of one per team
+        self.team_match_index = None
+        if self.uses_league_form:
+            print(f"\nFetching recent {league_name} results...")
+            with tracing.stage('league_form', league=league_id):
+                self.set_league_form(utils.get_competition_matches(league_id, store=self.store))
+        
+        self.model = None
+        if self.engine != 'gpt':
+            with tracing.stage('model_fit', league=league_id):
+                self.set_model(utils.get_competition_matches(league_id, days_back=MODEL_HISTORY_DAYS, store=self.store))
+        
+        print(f"\nFetching fixtures...")
+        with tracing.stage('fixtures', league=league_id):
+            if self.store is not None:
+                today = datetime.now(timezone.utc)
+                last_day = datetime.strptime(date_to, '%Y-%m-%d') if date_to else today + timedelta(days=30)
+                fixtures = self.store.competition_matches(
+                    league_id,
+                    date_from or today.strftime('%Y-%m-%d'),
+                    (last_day + timedelta(days=1)).strftime('%Y-%m-%d'),
+                    statuses=UPCOMING_STATUSES
+                )
+            else:
+                fixtures = fetch_upcoming_matches(league_id, self.football_api_key, date_from, date_to)
+        return self.set_fixtures(league_name, fixtures)
+
+    async def fetch_league_fixtures_async(self, league_name, date_from=None, date_to=None, client=None):
+        """fetch_league_fixtures with the teams, results, model history and fixtures requested at once.
+
+        Uses an AsyncFootballDataClient (client, or one opened for the call)
+        that shares the sync client's cache and rate limit. With a local
+        store there is no network to overlap, so this runs the sync version.
+        """
+        if league_name not in LEAGUE_IDS:
+            return False
+        if self.store is not None:
+            return self.fetch_league_fixtures(league_name, date_from, date_to)
+        import asyncio
+        import async_client  # aiohttp is only needed on the async paths
+
+        league_id = LEAGUE_IDS[league_name]
+        print(f"\nFetching teams, results and fixtures for {league_name} (ID: {league_id})...")
+
+        async def stage(name, coroutine):
+            with tracing.stage(name, league=league_id):
+                return await coroutine
+
+        async def skipped():
+            return None
+
+        async with async_client.client_or_new(client, self.football_api_key) as client:
+            teams, league_matches, history, fixtures = await asyncio.gather(
+                stage('teams', async_client.get_teams(league_id, client=client)),
+                stage('league_form', async_client.get_competition_matches(league_id, client=client))
+                if self.uses_league_form else skipped(),
+                stage('model_fit', async_client.get_competition_matches(league_id, MODEL_HISTORY_DAYS, client=client))
+                if self.engine != 'gpt' else skipped(),
+                stage('fixtures', async_client.fetch_upcoming_matches(league_id, date_from=date_from, date_to=date_to,
+                                                                      client=client)),
+            )
+        if not self.set_teams(league_name, teams):
+            return False
+        self.team_match_index = None
+        if league_matches is not None:
+            self.set_league_form(league_matches)
+        self.model = None
+        if history is not None:
+            self.set_model(history)
+        return self.set_fixtures(league_name, fixtures)
+
+    @property
+    def uses_league_form(self):
+        """Whether team form comes from the league-wide results (include_cups needs each team's full history)"""
+        return self.bulk_form and not self.include_cups
+
+    def set_teams(self, league_name, teams):
         if not teams:
             print("Failed to fetch teams data!")
             return False
             
         # Store teams data in dictionary for quick lookup
         self.teams_data = {team['name']: str(team['id']) for team in teams}
+        self.team_scope = {int(team['id']) for team in teams}
+        get_resolver().add_teams(teams)
         print(f"Found {len(self.teams_data)} teams in {league_name}")
-        
-        print(f"\nFetching fixtures...")
-        self.fixtures = fetch_upcoming_matches(league_id, self.football_api_key)
+        return True
+
+    def set_league_form(self, league_matches):
+        self.team_match_index = utils.build_team_match_index(league_matches)
+        self.form_table = FormTable.from_matches(league_matches)
+        print(f"Indexed {len(league_matches)} finished matches")
+
+    def set_model(self, history):
+        self.model = PoissonModel.from_matches(history)
+        print(f"Fitted Poisson model on {self.model.matches_used} matches")
+
+    def set_fixtures(self, league_name, fixtures):
+        self.fixtures = fixtures
         self.current_league = league_name
         self.current_batch_index = 0
+        self.prefetched_h2h = {}
+        self.prefetched_history = {}
         return bool(self.fixtures)
 
     def get_team_id(self, team_name):
-        """Get team ID from stored teams data"""
+        """Get team ID from stored teams data, falling back to the shared resolver"""
         # Try exact match first
         team_id = self.teams_data.get(team_name)
         if team_id:
             return team_id
             
-        # Try case-insensitive match
-        team_name_lower = team_name.lower()
-        for name, id in self.teams_data.items():
-            if team_name_lower in name.lower():
-                return id
-        
-        return None
+        # Normalized alias lookup (shared aliases within this league), then trigram fuzzy match
+        return get_resolver().resolve(team_name, scope=self.team_scope)
+
+    def get_team_form(self, team_id):
+        """Get a team's recent matches and form summary, from the league index when available"""
+        if self.team_match_index is not None and not self.include_cups:
+            return self.team_match_index.get(int(team_id), []), self.form_table.summary(team_id)
+        with tracing.span('team_form', team=team_id):
+            matches = self.prefetched_history.get(str(team_id))
+            if matches is None:
+                matches = utils.fetch_team_matches(team_id, store=self.store)
+            return utils.played_matches(matches), FormTable.from_matches(matches).summary(team_id)
+
+    def get_head_to_head(self, team1_id, team2_id):
+        """Head-to-head record for two teams, prefetched when prefetch_async ran"""
+        key = (str(team1_id), str(team2_id))
+        if key in self.prefetched_h2h:
+            return self.prefetched_h2h[key]
+        return utils.get_head_to_head(team1_id, team2_id, self.store)
+
+    def model_markets(self, home_team_id, away_team_id):
+        """Model probabilities for one fixture, or None without a fitted model"""
+        if self.model is None:
+            return None
+        return PoissonModel.fixture_markets(self.model.predict([int(home_team_id)], [int(away_team_id)]), 0)
 
     def format_match_data(self, comparison_data):
         """Format the match data into a readable string for ChatGPT"""
@@ -128,10 +275,13 @@ class MatchPredictor:
             summary = team_data['summary']
             output.append(f"Last {summary['matches_played']} matches: {summary['wins']}W-{summary['draws']}D-{summary['losses']}L")
             output.append(f"Win Rate: {summary['win_rate']}%")
+            output.append(f"Goals: {summary['goals_for']} scored, {summary['goals_against']} conceded, {summary['clean_sheets']} clean sheets")
+            output.append(f"BTTS: {summary['btts_rate']}% | Over 2.5 goals: {summary['over_2_5_rate']}%")
+            output.append(f"Home: {summary['home_record']} | Away: {summary['away_record']} | Last {len(summary['form'])}: {summary['form']}")
             
             output.append("\nRecent matches:")
             for match in team_data['match_history'][:5]:  # Last 5 matches
-                output.append(f"{match['date']}: {match['home_team']} {match['score']} {match['away_team']}")
+                output.append(f"{match.day}: {match.home_name} {match.score} {match.away_name}")
 
         # Format head-to-head data
         h2h = comparison_data.get('head_to_head')
@@ -143,7 +293,12 @@ class MatchPredictor:
             
             output.append("\nLast 5 head-to-head matches:")
             for match in h2h['matches'][:5]:
-                output.append(f"{match['date']}: {match['home_team']} {match['score']} {match['away_team']}")
+                output.append(f"{match.day}: {match.home_name} {match.score} {match.away_name}")
+
+        markets = comparison_data.get('model')
+        if markets:
+            output.append("\nStatistical model (Dixon-Coles Poisson):")
+            output.append(describe_markets(markets, comparison_data['team1']['name'], comparison_data['team2']['name']))
 
         return "\n".join(output)
 
@@ -155,139 +310,271 @@ class MatchPredictor:
         if not team1_id or not team2_id:
             return "One or both teams not found."
             
-        # Get individual team analyses
-        team1_matches = utils.get_team_matches(team1_id)
-        team2_matches = utils.get_team_matches(team2_id)
+        # Fetched in sequence: batches already run one fixture per worker thread
+        team1_matches, team1_summary = self.get_team_form(team1_id)
+        team2_matches, team2_summary = self.get_team_form(team2_id)
+        h2h_analysis = self.get_head_to_head(team1_id, team2_id)
         
         if not team1_matches:
             return f"No matches found for {team1_name}"
         if not team2_matches:
             return f"No matches found for {team2_name}"
         
-        # Calculate basic stats for team1
-        total_matches1 = len(team1_matches)
-        wins1 = sum(1 for match in team1_matches if match['result'] == 'W')
-        losses1 = sum(1 for match in team1_matches if match['result'] == 'L')
-        draws1 = sum(1 for match in team1_matches if match['result'] == 'D')
-        
-        # Calculate basic stats for team2
-        total_matches2 = len(team2_matches)
-        wins2 = sum(1 for match in team2_matches if match['result'] == 'W')
-        losses2 = sum(1 for match in team2_matches if match['result'] == 'L')
-        draws2 = sum(1 for match in team2_matches if match['result'] == 'D')
-        
         team1_analysis = {
             'name': team1_name,
             'match_history': team1_matches,
-            'summary': {
-                'matches_played': total_matches1,
-                'wins': wins1,
-                'draws': draws1,
-                'losses': losses1,
-                'win_rate': round((wins1 / total_matches1 * 100), 2) if total_matches1 > 0 else 0
-            }
+            'summary': team1_summary
         }
         
         team2_analysis = {
             'name': team2_name,
             'match_history': team2_matches,
-            'summary': {
-                'matches_played': total_matches2,
-                'wins': wins2,
-                'draws': draws2,
-                'losses': losses2,
-                'win_rate': round((wins2 / total_matches2 * 100), 2) if total_matches2 > 0 else 0
-            }
+            'summary': team2_summary
         }
         
-        # Get head-to-head analysis
-        h2h_analysis = utils.get_head_to_head(team1_id, team2_id)
-        
         return {
             'team1': team1_analysis,
             'team2': team2_analysis,
-            'head_to_head': h2h_analysis
+            'head_to_head': h2h_analysis,
+            'model': self.model_markets(team1_id, team2_id) if self.engine == 'hybrid' else None
         }
 
+    def get_match_data(self, team1_name, team2_name):
+        """Compare two teams and format the result for ChatGPT; returns (match_data, error)"""
+        with tracing.span('compare_teams', team1=team1_name, team2=team2_name):
+            comparison = self.compare_teams(team1_name, team2_name)
+        if isinstance(comparison, str):
+            return None, f"Error: {comparison}"
+        with tracing.span('format_match_data', team1=team1_name, team2=team2_name):
+            return self.format_match_data(comparison), None
+
     def get_predictions(self, team1_name, team2_name):
         """Get match predictions using ChatGPT"""
-        # Get match data
-        comparison = self.compare_teams(team1_name, team2_name)
-        if isinstance(comparison, str):
-            return f"Error: {comparison}"
+        match_data, error = self.get_match_data(team1_name, team2_name)
+        if error:
+            return error
 
-        # Format data for ChatGPT
-        match_data = self.format_match_data(comparison)
+        try:
+            return self.llm.predict(team1_name, team2_name, match_data)
+        except Exception as e:
+            return f"Error getting predictions: {str(e)}"
 
-        # Prepare prompt
-        prompt = f"""Based on the following match data and head-to-head history for {team1_name} vs {team2_name}:
+    def prepare_fixture(self, match):
+        """Resolve teams and build the match data for a fixture, without calling the LLM"""
+        home_team = match.home_name
+        away_team = match.away_name
+        formatted_date = match.kickoff.strftime('%B %d, %Y at %H:%M UTC')
+        
+        print(f"\nAnalyzing: {home_team} vs {away_team} ({formatted_date})")
+        
+        # Get team IDs for historical data
+        home_team_id = self.get_team_id(home_team)
+        away_team_id = self.get_team_id(away_team)
+        
+        if not home_team_id or not away_team_id:
+            print(f"Warning: Could not find IDs for one or both teams: {home_team} ({home_team_id}), {away_team} ({away_team_id})")
+            return None
+            
+        with tracing.stage('match_data', fixture=match.id, home_team=home_team_id, away_team=away_team_id):
+            match_data, error = self.get_match_data(home_team, away_team)
+        return {
+            'id': match.id,
+            'match': f"{home_team} vs {away_team}",
+            'date': formatted_date,
+            'home_team': home_team,
+            'away_team': away_team,
+            'match_data': match_data,
+            'predictions': error
+        }
 
-{match_data}
+    def analyze_fixture(self, match):
+        """Fetch data and predictions for a single fixture"""
+        fixture = self.prepare_fixture(match)
+        if fixture is None:
+            return None
+        
+        if fixture['predictions'] is None:
+            try:
+                with tracing.stage('llm', fixture=fixture['id']):
+                    fixture['predictions'] = self.llm.predict(fixture['home_team'], fixture['away_team'], fixture['match_data'])
+            except Exception as e:
+                fixture['predictions'] = f"Error getting predictions: {str(e)}"
+        return self.fixture_result(fixture)
 
-Using only the statistical and factual data provided, provide exactly 3 highly probable predictions for this match.
+    @staticmethod
+    def fixture_result(fixture):
+        return {
+            'match': fixture['match'],
+            'date': fixture['date'],
+            'predictions': fixture['predictions']
+        }
 
-Requirements:
-1. Each prediction must be directly supported by the data shown
-2. Format as exactly 3 bullet points
-3. Keep each prediction concise (max 15 words)
-4. Focus on concrete outcomes (goals, win/loss, scoring patterns)
-5. No explanations or analysis - just the predictions
+    def predict_with_model(self, matches):
+        """Predict fixtures from the Poisson model alone: one vectorized call, no network"""
+        fixtures = []
+        for match in matches:
+            home_team = match.home_name
+            away_team = match.away_name
+            home_team_id = match.home_id or self.get_team_id(home_team)
+            away_team_id = match.away_id or self.get_team_id(away_team)
+            if not home_team_id or not away_team_id:
+                print(f"Warning: Could not find IDs for one or both teams: {home_team} ({home_team_id}), {away_team} ({away_team_id})")
+                continue
+            match_date = match.kickoff
+            fixtures.append((home_team, away_team, int(home_team_id), int(away_team_id), match_date))
+        if not fixtures:
+            return []
 
-Example format:
-- Team A to win based on superior head-to-head record
-- Over 2.5 goals to be scored in the match
-- Both teams to score at least one goal"""
+        with tracing.stage('model_predict', fixtures=len(fixtures)):
+            prediction = self.model.predict([f[2] for f in fixtures], [f[3] for f in fixtures])
+        results = []
+        for i, (home_team, away_team, _, _, match_date) in enumerate(fixtures):
+            markets = PoissonModel.fixture_markets(prediction, i)
+            results.append({
+                'match': f"{home_team} vs {away_team}",
+                'date': match_date.strftime('%B %d, %Y at %H:%M UTC'),
+                'predictions': model_predictions(markets, home_team, away_team),
+                'probabilities': markets
+            })
+        return results
 
+    def predict_fixture_group(self, group):
+        """Fill in predictions for a group of prepared fixtures with one batched request"""
+        items = [(f['home_team'], f['away_team'], f['match_data']) for f in group]
         try:
-            # Get ChatGPT's response
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a football prediction expert. Provide exactly 3 bullet-point predictions. No explanations or analysis."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            return response.choices[0].message.content.strip()
+            with tracing.stage('llm_batch', fixtures=','.join(str(f['id']) for f in group)):
+                predictions = self.llm.predict_batch(items)
         except Exception as e:
-            return f"Error getting predictions: {str(e)}"
+            predictions = [f"Error getting predictions: {str(e)}"] * len(group)
+        for fixture, prediction in zip(group, predictions):
+            fixture['predictions'] = prediction
+
+    def analyze_fixture_group(self, matches):
+        """Prepare a group of fixtures and predict them with one batched LLM request"""
+        fixtures = [f for f in map(self.prepare_fixture, matches) if f]
+        pending = [f for f in fixtures if f['predictions'] is None]
+        if pending:
+            self.predict_fixture_group(pending)
+        return [self.fixture_result(f) for f in fixtures]
+
+    def work_units(self, fixtures):
+        """Split fixtures into independently schedulable units of work (see run_unit)"""
+        if self.engine == 'poisson':
+            return [fixtures]  # scored in one vectorized call
+        size = max(self.llm_batch_size, 1)
+        return [fixtures[i:i + size] for i in range(0, len(fixtures), size)]
+
+    def run_unit(self, matches):
+        """Predict one unit of work; returns its results in fixture order"""
+        if self.engine == 'poisson':
+            return self.predict_with_model(matches)
+        if self.llm_batch_size > 1:
+            return self.analyze_fixture_group(matches)
+        return [result for result in map(self.analyze_fixture, matches) if result]
+
+    def iter_predictions(self, fixtures=None, max_workers=None):
+        """Yield one result per fixture, in fixture order, as soon as each is ready.
+
+        Fixtures (default: all of self.fixtures) are analyzed concurrently on
+        a thread pool (API calls still share the client's rate limit), with
+        only a bounded number in flight, so consumers can act on the first
+        prediction while later ones are running.
+
+        With llm_batch_size > 1 the unit of work is a group of llm_batch_size
+        fixtures sent to the LLM in one packed JSON request, so the
+        instructions are paid for once per request rather than once per
+        fixture. With engine='poisson' the fixtures are scored by the local
+        model in one vectorized call and the LLM is never contacted.
+        """
+        fixtures = self.fixtures if fixtures is None else fixtures
+        if not fixtures:
+            return
+
+        units = self.work_units(fixtures)
+        workers = max(min(max_workers or self.max_workers, len(units)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for results in ordered_imap(executor, self.run_unit, units, workers * 2):
+                yield from results
+
+    async def prefetch_async(self, fixtures=None, client=None):
+        """Fetch every head-to-head (and, without the league index, every team history) the fixtures need at once.
+
+        The requests are multiplexed on the event loop by an
+        AsyncFootballDataClient; the results are kept in prefetched_h2h and
+        prefetched_history, where compare_teams finds them without touching
+        the network. The poisson engine needs neither.
+        """
+        fixtures = self.fixtures if fixtures is None else fixtures
+        if self.engine == 'poisson' or self.store is not None or not fixtures:
+            return
+        import asyncio
+        import async_client
+
+        pairs = {}
+        for match in fixtures:
+            home_team_id = self.get_team_id(match.home_name)
+            away_team_id = self.get_team_id(match.away_name)
+            if home_team_id and away_team_id:
+                pairs[(str(home_team_id), str(away_team_id))] = None
+        pairs = [pair for pair in pairs if pair not in self.prefetched_h2h]
+        teams = []
+        if self.team_match_index is None or self.include_cups:
+            teams = list({team_id for pair in pairs for team_id in pair if team_id not in self.prefetched_history})
+
+        async with async_client.client_or_new(client, self.football_api_key) as client:
+            h2h, histories = await asyncio.gather(
+                asyncio.gather(*(async_client.get_head_to_head(*pair, client=client) for pair in pairs)),
+                asyncio.gather(*(async_client.fetch_team_matches(team_id, client=client) for team_id in teams)),
+            )
+        self.prefetched_h2h.update(zip(pairs, h2h))
+        self.prefetched_history.update(zip(teams, histories))
 
-    def process_next_batch(self, batch_size=3):
-        """Process the next batch of fixtures"""
+    async def iter_predictions_async(self, fixtures=None, max_workers=None, client=None):
+        """Async counterpart of iter_predictions: yields one result per fixture, in fixture order.
+
+        All API data is prefetched concurrently on the event loop first (see
+        prefetch_async). The work units then run in worker threads, at most
+        max_workers at a time, because the OpenAI client is synchronous.
+        """
+        import asyncio
+
+        fixtures = self.fixtures if fixtures is None else fixtures
+        if not fixtures:
+            return
+        await self.prefetch_async(fixtures, client)
+
+        units = self.work_units(fixtures)
+        limit = asyncio.Semaphore(max(max_workers or self.max_workers, 1))
+
+        async def run(unit):
+            async with limit:
+                return await asyncio.to_thread(self.run_unit, unit)
+
+        tasks = [asyncio.ensure_future(run(unit)) for unit in units]
+        try:
+            for task in tasks:
+                for result in await task:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def process_next_batch(self, batch_size=3, max_workers=None):
+        """Process the next batch_size fixtures and return their results as a list (see iter_predictions)"""
         if not self.fixtures or self.current_batch_index >= len(self.fixtures):
             return False
 
         end_index = min(self.current_batch_index + batch_size, len(self.fixtures))
         current_batch = self.fixtures[self.current_batch_index:end_index]
-        results = []
-
-        for match in current_batch:
-            home_team = match['homeTeam']['name']
-            away_team = match['awayTeam']['name']
-            match_date = datetime.strptime(match['utcDate'], '%Y-%m-%dT%H:%M:%SZ')
-            formatted_date = match_date.strftime('%B %d, %Y at %H:%M UTC')
-            
-            print(f"\nAnalyzing: {home_team} vs {away_team} ({formatted_date})")
-            
-            # Get team IDs for historical data
-            home_team_id = self.get_team_id(home_team)
-            away_team_id = self.get_team_id(away_team)
-            
-            if not home_team_id or not away_team_id:
-                print(f"Warning: Could not find IDs for one or both teams: {home_team} ({home_team_id}), {away_team} ({away_team_id})")
-                continue
-                
-            predictions = self.get_predictions(home_team, away_team)
-            results.append({
-                'match': f"{home_team} vs {away_team}",
-                'date': formatted_date,
-                'predictions': predictions
-            })
-
+        results = list(self.iter_predictions(current_batch, max_workers))
         self.current_batch_index = end_index
         return results
 
 def main():
-    predictor = MatchPredictor()
+    metrics.start()
+    # USE_MATCH_STORE=1 reads everything from the local warehouse (see match_store.py sync)
+    predictor = MatchPredictor(store=MatchStore() if os.getenv('USE_MATCH_STORE') else None)
+    print(f"Prediction engine: {predictor.engine}")
     
     # Show available leagues
     print("Available leagues:")
@@ -345,5 +632,15 @@ def main():
             if continue_analysis != 'yes':
                 break
 
+    usage = predictor.llm.usage.summary()
+    if usage['requests']:
+        print(f"\nLLM usage: {usage['requests']} request(s), {usage['prompt_tokens']} prompt + "
+              f"{usage['completion_tokens']} completion tokens, avg latency {usage['avg_latency']}s")
+    if predictor.llm.cache is not None:
+        cache_stats = predictor.llm.cache.stats()
+        print(f"Prediction cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es)")
+    metrics.export()
+    tracing.export()
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
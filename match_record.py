@@ -0,0 +1,127 @@
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# football-data.org match statuses; MatchRecord.status holds the position in this tuple
+STATUSES = (
+    'SCHEDULED', 'TIMED', 'IN_PLAY', 'PAUSED', 'EXTRA_TIME', 'PENALTY_SHOOTOUT',
+    'FINISHED', 'SUSPENDED', 'POSTPONED', 'CANCELLED', 'AWARDED',
+)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+UNKNOWN_STATUS = -1
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def epoch_seconds(utc_date):
+    """Seconds since the epoch for an API timestamp ("2024-03-02T15:00:00Z")"""
+    return int((datetime.fromisoformat(utc_date.rstrip('Z')) - EPOCH).total_seconds())
+
+
+def intern_name(value):
+    """One shared copy of a team or competition name (they repeat across thousands of records)"""
+    return sys.intern(value) if value else value
+
+
+@dataclass(slots=True)
+class MatchRecord:
+    """One match, projected down to the fields the predictor and analyzer use.
+
+    Goals are ints (None until the match is played), the kickoff is epoch
+    seconds (UTC) and the status is a code into STATUSES. Team and
+    competition names are interned, so a record costs about 160 bytes
+    instead of the ~2 KB of nested dicts in a raw API match.
+    """
+    id: int | None
+    date: int
+    status: int
+    home_id: int | None
+    away_id: int | None
+    home_goals: int | None
+    away_goals: int | None
+    home_name: str | None
+    away_name: str | None
+    competition: str | None
+    venue: str | None = None
+
+    @classmethod
+    def from_api(cls, match, competition=None):
+        """Project a raw API match (competition is the listing's block, for matches that omit their own)"""
+        score = (match.get('score') or {}).get('fullTime') or {}
+        home, away = match['homeTeam'], match['awayTeam']
+        return cls(
+            match.get('id'),
+            epoch_seconds(match['utcDate']),
+            STATUS_CODES.get(match.get('status'), UNKNOWN_STATUS),
+            home.get('id'),
+            away.get('id'),
+            score.get('home'),
+            score.get('away'),
+            intern_name(home.get('name')),
+            intern_name(away.get('name')),
+            intern_name((match.get('competition') or competition or {}).get('name')),
+            intern_name(match.get('venue')),
+        )
+
+    @property
+    def played(self):
+        return self.home_goals is not None and self.away_goals is not None
+
+    @property
+    def kickoff(self):
+        """Kickoff as a naive UTC datetime"""
+        return EPOCH + timedelta(seconds=self.date)
+
+    @property
+    def day(self):
+        """Kickoff date as YYYY-MM-DD"""
+        return self.kickoff.strftime('%Y-%m-%d')
+
+    @property
+    def score(self):
+        return f"{self.home_goals} - {self.away_goals}"
+
+    @property
+    def status_name(self):
+        return STATUSES[self.status] if self.status >= 0 else 'UNKNOWN'
+
+    def result_for(self, team_id):
+        """'W', 'D' or 'L' from team_id's point of view"""
+        is_home = self.home_id == int(team_id)
+        goals_for = self.home_goals if is_home else self.away_goals
+        goals_against = self.away_goals if is_home else self.home_goals
+        if goals_for > goals_against:
+            return 'W'
+        if goals_for < goals_against:
+            return 'L'
+        return 'D'
+
+
+def project(matches, competition=None):
+    """MatchRecords for a list of raw API matches"""
+    return [MatchRecord.from_api(match, competition) for match in matches]
+
+
+def played_columns(records):
+    """Struct-of-arrays view of the played records, skipping duplicate match IDs.
+
+    Returns (home_ids, away_ids, home_goals, away_goals, dates) as int64
+    arrays that numpy can wrap without copying.
+    """
+    seen = set()
+    columns = tuple(array('q') for _ in range(5))
+    home_ids, away_ids, home_goals, away_goals, dates = columns
+    for record in records:
+        if record.home_goals is None or record.away_goals is None:
+            continue
+        if record.id is not None:
+            if record.id in seen:
+                continue
+            seen.add(record.id)
+        home_ids.append(record.home_id)
+        away_ids.append(record.away_id)
+        home_goals.append(record.home_goals)
+        away_goals.append(record.away_goals)
+        dates.append(record.date)
+    return columns
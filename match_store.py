@@ -0,0 +1,378 @@
+import argparse
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from api_client import get_client
+from leagues import LEAGUE_IDS
+from match_record import STATUS_CODES, UNKNOWN_STATUS, MatchRecord, epoch_seconds, intern_name
+from pair_index import find_match_id
+
+# Location of the local match warehouse (override with MATCH_STORE_PATH)
+STORE_PATH = os.getenv('MATCH_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.matches.sqlite'))
+
+# How far back the first sync of a competition reaches
+INITIAL_DAYS_BACK = 365
+
+# How far ahead fixtures are synced
+DAYS_AHEAD = 30
+
+# Statuses of matches that have not been played yet
+UPCOMING_STATUSES = ('SCHEDULED', 'TIMED')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    competition_id INTEGER,
+    competition_name TEXT,
+    matchday INTEGER,
+    utc_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    home_id INTEGER,
+    home_name TEXT,
+    away_id INTEGER,
+    away_name TEXT,
+    home_goals INTEGER,
+    away_goals INTEGER,
+    last_updated TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_matches_home ON matches (home_id, utc_date);
+CREATE INDEX IF NOT EXISTS idx_matches_away ON matches (away_id, utc_date);
+CREATE INDEX IF NOT EXISTS idx_matches_competition ON matches (competition_id, utc_date);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (utc_date);
+
+CREATE TABLE IF NOT EXISTS h2h_aggregates (
+    team_a INTEGER NOT NULL,
+    team_b INTEGER NOT NULL,
+    total_matches INTEGER,
+    total_goals INTEGER,
+    team_a_wins INTEGER,
+    team_b_wins INTEGER,
+    draws INTEGER,
+    updated_at TEXT,
+    PRIMARY KEY (team_a, team_b)
+);
+
+CREATE TABLE IF NOT EXISTS scraped_matches (
+    date TEXT NOT NULL,
+    competition TEXT,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_goals TEXT,
+    away_goals TEXT,
+    source TEXT,
+    PRIMARY KEY (date, home_team, away_team)
+);
+CREATE INDEX IF NOT EXISTS idx_scraped_teams ON scraped_matches (home_team, away_team);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    competition_id INTEGER PRIMARY KEY,
+    watermark TEXT NOT NULL,
+    synced_at TEXT NOT NULL
+);
+"""
+
+MATCH_COLUMNS = ('id, competition_id, competition_name, matchday, utc_date, status, '
+                 'home_id, home_name, away_id, away_name, home_goals, away_goals, last_updated')
+
+# Columns read back into MatchRecords, in MatchRecord field order
+RECORD_COLUMNS = ('id, utc_date, status, home_id, away_id, home_goals, away_goals, '
+                  'home_name, away_name, competition_name')
+
+
+def match_to_row(match, competition=None):
+    """Flatten a raw API match into a matches-table row"""
+    competition = match.get('competition') or competition or {}
+    score = (match.get('score') or {}).get('fullTime') or {}
+    return (
+        match['id'],
+        competition.get('id'),
+        competition.get('name'),
+        match.get('matchday'),
+        match['utcDate'],
+        match.get('status', ''),
+        match['homeTeam'].get('id'),
+        match['homeTeam'].get('name'),
+        match['awayTeam'].get('id'),
+        match['awayTeam'].get('name'),
+        score.get('home'),
+        score.get('away'),
+        match.get('lastUpdated', ''),
+    )
+
+
+def row_to_record(row):
+    """MatchRecord for a RECORD_COLUMNS row"""
+    match_id, utc_date, status, home_id, away_id, home_goals, away_goals, home_name, away_name, competition = row
+    return MatchRecord(match_id, epoch_seconds(utc_date), STATUS_CODES.get(status, UNKNOWN_STATUS), home_id, away_id,
+                       home_goals, away_goals, intern_name(home_name), intern_name(away_name), intern_name(competition))
+
+
+class MatchStore:
+    """Local SQLite warehouse of fixtures, results, H2H aggregates and scraped rows"""
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # Writing
+
+    def upsert_matches(self, matches, competition=None):
+        """Insert or update raw API matches; rows only change when lastUpdated moves forward"""
+        rows = [match_to_row(match, competition) for match in matches]
+        if not rows:
+            return 0
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                f"""INSERT INTO matches ({MATCH_COLUMNS}) VALUES ({', '.join('?' * 13)})
+                    ON CONFLICT (id) DO UPDATE SET
+                        competition_id = COALESCE(excluded.competition_id, matches.competition_id),
+                        competition_name = COALESCE(excluded.competition_name, matches.competition_name),
+                        matchday = excluded.matchday, utc_date = excluded.utc_date, status = excluded.status,
+                        home_id = excluded.home_id, home_name = excluded.home_name,
+                        away_id = excluded.away_id, away_name = excluded.away_name,
+                        home_goals = excluded.home_goals, away_goals = excluded.away_goals,
+                        last_updated = excluded.last_updated
+                    WHERE excluded.last_updated > matches.last_updated OR matches.last_updated = ''""",
+                rows
+            )
+            self.conn.commit()
+            return self.conn.total_changes - before
+
+    def save_h2h(self, team1_id, team2_id, stats):
+        """Store head-to-head aggregates in the shape utils.get_head_to_head returns"""
+        team_a, team_b = sorted((int(team1_id), int(team2_id)))
+        a_wins, b_wins = stats['team1_wins'], stats['team2_wins']
+        if team_a != int(team1_id):
+            a_wins, b_wins = b_wins, a_wins
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO h2h_aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (team_a, team_b, stats['total_matches'], stats['total_goals'], a_wins, b_wins,
+                 stats['draws'], datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
+            )
+            self.conn.commit()
+
+    def save_scraped(self, matches, source='sofascore'):
+        """Store rows produced by football_scraper.parse_head_to_head_data"""
+        rows = [
+            (m['date'], m['competition'], m['home_team'], m['away_team'], m['home_goals'], m['away_goals'], source)
+            for m in matches
+        ]
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO scraped_matches VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+        return len(rows)
+
+    # Reading (results come back as MatchRecords)
+
+    def team_matches(self, team_id, date_from, date_to, statuses=('FINISHED',)):
+        team_id = int(team_id)
+        placeholders = ', '.join('?' * len(statuses))
+        rows = self._query(
+            f"""SELECT {RECORD_COLUMNS} FROM matches
+                WHERE (home_id = ? OR away_id = ?) AND utc_date >= ? AND utc_date < ?
+                  AND status IN ({placeholders})
+                ORDER BY utc_date""",
+            (team_id, team_id, date_from, date_to, *statuses)
+        )
+        return [row_to_record(row) for row in rows]
+
+    def competition_matches(self, competition_id, date_from, date_to, statuses=('FINISHED',)):
+        placeholders = ', '.join('?' * len(statuses))
+        rows = self._query(
+            f"""SELECT {RECORD_COLUMNS} FROM matches
+                WHERE competition_id = ? AND utc_date >= ? AND utc_date < ? AND status IN ({placeholders})
+                ORDER BY utc_date""",
+            (int(competition_id), date_from, date_to, *statuses)
+        )
+        return [row_to_record(row) for row in rows]
+
+    def competition_teams(self, competition_id):
+        """Teams seen in a competition, as {"id", "name"} dicts like teams.get_teams"""
+        rows = self._query(
+            """SELECT home_id, home_name FROM matches WHERE competition_id = ?
+               UNION SELECT away_id, away_name FROM matches WHERE competition_id = ?""",
+            (int(competition_id), int(competition_id))
+        )
+        return [{'id': team_id, 'name': name} for team_id, name in rows if team_id]
+
+    def head_to_head(self, team1_id, team2_id, limit=60):
+        """Finished meetings between two teams, most recent first"""
+        team1_id, team2_id = int(team1_id), int(team2_id)
+        rows = self._query(
+            f"""SELECT {RECORD_COLUMNS} FROM matches
+                WHERE status = 'FINISHED'
+                  AND ((home_id = ? AND away_id = ?) OR (home_id = ? AND away_id = ?))
+                ORDER BY utc_date DESC LIMIT ?""",
+            (team1_id, team2_id, team2_id, team1_id, limit)
+        )
+        return [row_to_record(row) for row in rows]
+
+    def h2h_aggregates(self, team1_id, team2_id):
+        """Stored aggregates oriented to team1/team2, or None"""
+        team1_id, team2_id = int(team1_id), int(team2_id)
+        rows = self._query(
+            "SELECT team_a, total_matches, total_goals, team_a_wins, team_b_wins, draws "
+            "FROM h2h_aggregates WHERE team_a = ? AND team_b = ?",
+            tuple(sorted((team1_id, team2_id)))
+        )
+        if not rows:
+            return None
+        team_a, total_matches, total_goals, a_wins, b_wins, draws = rows[0]
+        if team_a != team1_id:
+            a_wins, b_wins = b_wins, a_wins
+        return {
+            'total_matches': total_matches,
+            'total_goals': total_goals,
+            'team1_wins': a_wins,
+            'team2_wins': b_wins,
+            'draws': draws,
+        }
+
+    def scraped_matches(self, team1, team2):
+        rows = self._query(
+            """SELECT date, competition, home_team, away_team, home_goals, away_goals FROM scraped_matches
+               WHERE (home_team = ? AND away_team = ?) OR (home_team = ? AND away_team = ?)""",
+            (team1, team2, team2, team1)
+        )
+        keys = ('date', 'competition', 'home_team', 'away_team', 'home_goals', 'away_goals')
+        return [dict(zip(keys, row)) for row in rows]
+
+    # Incremental sync
+
+    def watermark(self, competition_id):
+        rows = self._query("SELECT watermark FROM sync_state WHERE competition_id = ?", (int(competition_id),))
+        return rows[0][0] if rows else None
+
+    def sync_competition(self, competition_id, initial_days_back=INITIAL_DAYS_BACK, days_ahead=DAYS_AHEAD):
+        """Fetch only the matches that can have changed since the last sync"""
+        now = datetime.now(timezone.utc)
+        today = now.strftime('%Y-%m-%d')
+        watermark = self.watermark(competition_id)
+
+        if watermark:
+            date_from = watermark
+            # Matches that were still unplayed at the last sync may have a result now
+            pending = self._query(
+                f"""SELECT MIN(utc_date) FROM matches WHERE competition_id = ? AND utc_date < ?
+                    AND status NOT IN ('FINISHED', 'CANCELLED', 'AWARDED')""",
+                (int(competition_id), now.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            )[0][0]
+            if pending:
+                date_from = min(date_from, pending[:10])
+        else:
+            date_from = (now - timedelta(days=initial_days_back)).strftime('%Y-%m-%d')
+
+        params = {
+            'dateFrom': date_from,
+            'dateTo': (now + timedelta(days=days_ahead)).strftime('%Y-%m-%d'),
+        }
+        response = get_client().get(f"/competitions/{competition_id}/matches", params=params, ttl=0)
+        if response.status_code != 200:
+            print(f"Sync failed for competition {competition_id} (status {response.status_code})")
+            return None
+
+        data = response.json()
+        changed = self.upsert_matches(data.get('matches', []), data.get('competition'))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                (int(competition_id), today, now.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            )
+            self.conn.commit()
+        return changed
+
+    def sync_head_to_head(self, team1_id, team2_id, limit=60):
+        """Fetch the API head-to-head for a pair and store its matches and aggregates"""
+        client = get_client()
+        match_id = find_match_id(client, team1_id, team2_id)
+        if not match_id:
+            return False
+        response = client.get(f"/matches/{match_id}/head2head", params={'limit': limit})
+        if response.status_code != 200:
+            return False
+
+        data = response.json()
+        self.upsert_matches(data.get('matches', []))
+        agg = data['aggregates']
+        team1_is_home = agg['homeTeam']['id'] == int(team1_id)
+        self.save_h2h(team1_id, team2_id, {
+            'total_matches': agg['numberOfMatches'],
+            'total_goals': agg['totalGoals'],
+            'team1_wins': agg['homeTeam']['wins'] if team1_is_home else agg['awayTeam']['wins'],
+            'team2_wins': agg['awayTeam']['wins'] if team1_is_home else agg['homeTeam']['wins'],
+            'draws': agg['homeTeam']['draws'],
+        })
+        return True
+
+    def sync_upcoming_head_to_heads(self, competition_id, days_ahead=DAYS_AHEAD):
+        """Refresh head-to-head data for every stored upcoming fixture of a competition"""
+        now = datetime.now(timezone.utc)
+        fixtures = self.competition_matches(
+            competition_id,
+            now.strftime('%Y-%m-%d'),
+            (now + timedelta(days=days_ahead)).strftime('%Y-%m-%d'),
+            statuses=UPCOMING_STATUSES
+        )
+        return sum(
+            1 for fixture in fixtures
+            if self.sync_head_to_head(fixture.home_id, fixture.away_id)
+        )
+
+    def sync(self, competition_ids=None):
+        """Sync several competitions; returns {competition_id: changed rows}"""
+        results = {}
+        for competition_id in competition_ids or LEAGUE_IDS.values():
+            results[competition_id] = self.sync_competition(competition_id)
+        return results
+
+    def stats(self):
+        return {
+            'matches': self._query("SELECT COUNT(*) FROM matches")[0][0],
+            'h2h_aggregates': self._query("SELECT COUNT(*) FROM h2h_aggregates")[0][0],
+            'scraped_matches': self._query("SELECT COUNT(*) FROM scraped_matches")[0][0],
+            'competitions_synced': self._query("SELECT COUNT(*) FROM sync_state")[0][0],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local football match warehouse")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sync_parser = subparsers.add_parser('sync', help="Incrementally sync competitions from football-data.org")
+    sync_parser.add_argument('leagues', nargs='*', help="League names from LEAGUE_IDS (default: all)")
+    sync_parser.add_argument('--h2h', action='store_true', help="Also refresh head-to-head data for upcoming fixtures")
+    subparsers.add_parser('stats', help="Show row counts")
+
+    args = parser.parse_args()
+    store = MatchStore()
+
+    if args.command == 'sync':
+        unknown = [league for league in args.leagues if league not in LEAGUE_IDS]
+        if unknown:
+            parser.error(f"Unknown league(s): {', '.join(unknown)}")
+        leagues = args.leagues or list(LEAGUE_IDS)
+        for league in leagues:
+            changed = store.sync_competition(LEAGUE_IDS[league])
+            if changed is not None:
+                print(f"{league}: {changed} match(es) added or updated")
+            if args.h2h:
+                pairs = store.sync_upcoming_head_to_heads(LEAGUE_IDS[league])
+                print(f"{league}: head-to-head refreshed for {pairs} fixture(s)")
+    else:
+        for key, value in store.stats().items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
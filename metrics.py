@@ -0,0 +1,245 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Write a snapshot here at the end of a run: *.json for JSON, anything else for Prometheus text
+METRICS_FILE = os.getenv('METRICS_FILE')
+
+# Serve /metrics (Prometheus text) and /metrics.json on this local port while running
+METRICS_PORT = os.getenv('METRICS_PORT')
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_label(url):
+    """http://api.football-data.org/v4/teams/57/matches -> /teams/{id}/matches"""
+    path = re.sub(r'^https?://[^/]+', '', url).split('?')[0]
+    return ID_SEGMENT.sub('/{id}', re.sub(r'^/v\d+', '', path))
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key)) + list(extra or [])
+    if not pairs:
+        return ''
+    escaped = (f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for name, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def total(self, **labels):
+        """Sum over every series matching the given labels"""
+        with self.lock:
+            return sum(
+                value for key, value in self.values.items()
+                if all(key[self.labelnames.index(k)] == str(v) for k, v in labels.items())
+            )
+
+    def prometheus(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+    def snapshot(self):
+        with self.lock:
+            return [{'labels': dict(zip(self.labelnames, key)), 'value': value} for key, value in sorted(self.values.items())]
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label key -> [bucket counts..., count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self.lock:
+            series = self.series.setdefault(key, [0] * len(self.buckets) + [0, 0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def prometheus(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', bound)])} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {round(series[-1], 6)}")
+        return lines
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {
+                    'labels': dict(zip(self.labelnames, key)),
+                    'count': series[-2],
+                    'sum': round(series[-1], 6),
+                    'mean': round(series[-1] / series[-2], 6) if series[-2] else 0.0,
+                    'buckets': {str(bound): count for bound, count in zip(self.buckets, series)},
+                }
+                for key, series in sorted(self.series.items())
+            ]
+
+
+class Registry:
+    """A named set of counters and histograms with Prometheus and JSON export"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def prometheus(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines += metric.prometheus()
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        snapshot = {name: metric.snapshot() for name, metric in list(self.metrics.items())}
+        snapshot['derived'] = derived()
+        return snapshot
+
+    def write(self, path):
+        """Write a JSON (*.json) or Prometheus text snapshot"""
+        with open(path, 'w') as f:
+            if path.endswith('.json'):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.prometheus())
+
+
+REGISTRY = Registry()
+
+API_REQUESTS = REGISTRY.counter(
+    'football_api_requests_total', "football-data.org HTTP requests sent", ('endpoint', 'status'))
+API_LATENCY = REGISTRY.histogram(
+    'football_api_request_seconds', "football-data.org request latency", ('endpoint',))
+API_THROTTLED = REGISTRY.counter(
+    'football_api_throttled_total', "HTTP 429 responses from football-data.org", ('endpoint',))
+API_RATE_LIMIT_WAIT = REGISTRY.histogram(
+    'football_api_rate_limit_wait_seconds', "Time spent queued by the client-side rate limiter")
+API_COALESCED = REGISTRY.counter(
+    'football_api_coalesced_total', "Requests answered by an identical in-flight or memoized call", ('kind',))
+RESPONSE_CACHE = REGISTRY.counter(
+    'response_cache_lookups_total', "Response cache lookups", ('endpoint_class', 'result'))
+LLM_REQUESTS = REGISTRY.counter(
+    'llm_requests_total', "OpenAI chat completion requests", ('model', 'status'))
+LLM_LATENCY = REGISTRY.histogram(
+    'llm_request_seconds', "OpenAI chat completion latency", ('model',))
+LLM_TOKENS = REGISTRY.counter(
+    'llm_tokens_total', "Tokens used by OpenAI requests", ('model', 'kind'))
+PREDICTION_CACHE = REGISTRY.counter(
+    'prediction_cache_lookups_total', "Prediction cache lookups", ('result',))
+STAGE_SECONDS = REGISTRY.histogram(
+    'predictor_stage_seconds', "Time spent in each prediction stage", ('stage',))
+
+
+def derived():
+    """Ratios worth reading directly from a JSON snapshot"""
+    def ratio(counter):
+        hits, misses = counter.total(result='hit'), counter.total(result='miss')
+        return round(hits / (hits + misses), 4) if hits + misses else None
+
+    return {
+        'api_requests': API_REQUESTS.total(),
+        'api_throttled': API_THROTTLED.total(),
+        'api_coalesced': API_COALESCED.total(),
+        'response_cache_hit_ratio': ratio(RESPONSE_CACHE),
+        'prediction_cache_hit_ratio': ratio(PREDICTION_CACHE),
+        'llm_requests': LLM_REQUESTS.total(),
+        'llm_prompt_tokens': LLM_TOKENS.total(kind='prompt'),
+        'llm_completion_tokens': LLM_TOKENS.total(kind='completion'),
+    }
+
+
+def serve(port, registry=REGISTRY, host='127.0.0.1'):
+    """Serve /metrics and /metrics.json from a background thread; returns the server"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith('/metrics.json'):
+                body, content_type = json.dumps(registry.snapshot()).encode(), 'application/json'
+            elif self.path.startswith('/metrics'):
+                body, content_type = registry.prometheus().encode(), 'text/plain; version=0.0.4'
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def start(port=None):
+    """Serve metrics on port (default METRICS_PORT) if one is configured"""
+    port = port or METRICS_PORT
+    return serve(port) if port else None
+
+
+def export(path=None):
+    """Write the end-of-run snapshot to path (default METRICS_FILE) if one is configured"""
+    path = path or METRICS_FILE
+    if path:
+        REGISTRY.write(path)
+        print(f"Metrics written to {path}")
@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+
+from cache import CACHE_PATH
+
+
+class PairIndex:
+    """Persistent map from an unordered team-ID pair to a match between them.
+
+    /matches/{id}/head2head needs the ID of any match between the two teams.
+    Every match payload the client sees is recorded here, so the head-to-head
+    lookup no longer has to download and scan a team's full match list.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS team_pairs (
+                team_a INTEGER NOT NULL,
+                team_b INTEGER NOT NULL,
+                match_id INTEGER NOT NULL,
+                utc_date TEXT NOT NULL,
+                PRIMARY KEY (team_a, team_b)
+            )"""
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def pair(team1_id, team2_id):
+        team1_id, team2_id = int(team1_id), int(team2_id)
+        return (team1_id, team2_id) if team1_id < team2_id else (team2_id, team1_id)
+
+    def lookup(self, team1_id, team2_id):
+        """Return a known match ID between the two teams, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT match_id FROM team_pairs WHERE team_a = ? AND team_b = ?",
+                self.pair(team1_id, team2_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def record_matches(self, matches):
+        """Remember the most recent match for every pair in a list of raw API matches"""
+        rows = []
+        for match in matches:
+            home_id = (match.get('homeTeam') or {}).get('id')
+            away_id = (match.get('awayTeam') or {}).get('id')
+            if not home_id or not away_id or not match.get('id'):
+                continue
+            rows.append(self.pair(home_id, away_id) + (match['id'], match.get('utcDate', '')))
+
+        if not rows:
+            return 0
+
+        with self.lock:
+            self.conn.executemany(
+                """INSERT INTO team_pairs (team_a, team_b, match_id, utc_date) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (team_a, team_b) DO UPDATE SET
+                       match_id = excluded.match_id, utc_date = excluded.utc_date
+                   WHERE excluded.utc_date > team_pairs.utc_date""",
+                rows
+            )
+            self.conn.commit()
+        return len(rows)
+
+    def record_payload(self, payload):
+        """Record pairs from any API payload that carries a matches list"""
+        if isinstance(payload, dict) and isinstance(payload.get('matches'), list):
+            return self.record_matches(payload['matches'])
+        return 0
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_pair_index():
+    """Return the process-wide pair index"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = PairIndex()
+    return _default_index
+
+
+# Query for the team history scanned on an index miss
+SCAN_PARAMS = {
+    'status': 'FINISHED',
+    'limit': 200
+}
+
+
+def find_match_id(client, team1_id, team2_id):
+    """Find a match between two teams in the client's pair index, scanning team1's history only on a miss"""
+    index = client.pair_index
+    match_id = index.lookup(team1_id, team2_id)
+    if match_id:
+        return match_id
+
+    response = client.get(f"/teams/{team1_id}/matches", params=SCAN_PARAMS)
+    response.raise_for_status()
+
+    # The client records every payload it returns, so the scan has filled the index
+    return index.lookup(team1_id, team2_id)
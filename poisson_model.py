@@ -0,0 +1,223 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from match_record import played_columns
+
+# Scorelines are modelled from 0 to MAX_GOALS goals per side
+MAX_GOALS = 10
+
+# Older matches count less: a match this many days old has half the weight (Dixon-Coles time decay)
+HALF_LIFE_DAYS = 180
+
+# Pseudo-goals added to every team so sparse histories shrink towards the league average
+PRIOR_GOALS = 1.0
+
+FIT_ITERATIONS = 100
+FIT_TOLERANCE = 1e-8
+
+# Candidate values for the Dixon-Coles low-score correlation parameter
+RHO_GRID = np.linspace(-0.2, 0.2, 81)
+
+LOG_FACTORIALS = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, MAX_GOALS + 1)))])
+
+
+def poisson_pmf(rates):
+    """P(k goals) for k = 0..MAX_GOALS, for every rate at once -> shape (len(rates), MAX_GOALS + 1)"""
+    rates = np.asarray(rates, dtype=float)[:, None]
+    goals = np.arange(MAX_GOALS + 1)[None, :]
+    return np.exp(goals * np.log(rates) - rates - LOG_FACTORIALS[None, :])
+
+
+def dixon_coles_tau(home_goals, away_goals, home_rates, away_rates, rho):
+    """Dixon-Coles adjustment for 0-0, 1-0, 0-1 and 1-1 scorelines"""
+    tau = np.ones(np.broadcast(home_goals, away_goals, rho).shape)
+    tau = np.where((home_goals == 0) & (away_goals == 0), 1 - home_rates * away_rates * rho, tau)
+    tau = np.where((home_goals == 0) & (away_goals == 1), 1 + home_rates * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 0), 1 + away_rates * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 1), 1 - rho, tau)
+    return tau
+
+
+class PoissonModel:
+    """Dixon-Coles model: team attack/defence strengths plus a home advantage.
+
+    Home goals ~ Poisson(attack[home] * defence[away] * home_advantage) and
+    away goals ~ Poisson(attack[away] * defence[home]), with the Dixon-Coles
+    correction for low scores. Strengths are fitted with time-weighted
+    closed-form coordinate updates (each one a couple of np.bincount calls),
+    and predictions for any number of fixtures are computed as one array
+    of scoreline probabilities.
+    """
+
+    def __init__(self, half_life_days=HALF_LIFE_DAYS, prior_goals=PRIOR_GOALS):
+        self.half_life_days = half_life_days
+        self.prior_goals = prior_goals
+        self.team_ids = np.array([], dtype=np.int64)
+        self.positions = {}
+        self.attack = np.array([])
+        self.defence = np.array([])
+        self.home_advantage = 1.0
+        self.rho = 0.0
+        self.matches_used = 0
+
+    @classmethod
+    def from_matches(cls, matches, reference_date=None, **kwargs):
+        return cls(**kwargs).fit(matches, reference_date)
+
+    def fit(self, matches, reference_date=None):
+        """Fit strengths from MatchRecords (unplayed ones and duplicate match IDs are ignored)"""
+        home_ids, away_ids, home_goals, away_goals, dates = played_columns(matches)
+        self.matches_used = len(home_ids)
+        if not self.matches_used:
+            return self
+
+        home_ids = np.asarray(home_ids, dtype=np.int64)
+        away_ids = np.asarray(away_ids, dtype=np.int64)
+        home_goals = np.asarray(home_goals, dtype=float)
+        away_goals = np.asarray(away_goals, dtype=float)
+        dates = np.asarray(dates, dtype='datetime64[s]')
+
+        reference = np.datetime64(reference_date or datetime.now(timezone.utc).replace(tzinfo=None), 's')
+        age_days = np.maximum((reference - dates).astype(float) / 86400.0, 0.0)
+        weights = 0.5 ** (age_days / self.half_life_days)
+
+        self.team_ids, index = np.unique(np.concatenate([home_ids, away_ids]), return_inverse=True)
+        self.positions = {int(team_id): i for i, team_id in enumerate(self.team_ids)}
+        home, away = index[:self.matches_used], index[self.matches_used:]
+        size = len(self.team_ids)
+
+        def per_team(team_index, values):
+            return np.bincount(team_index, weights=values, minlength=size)
+
+        # Weighted goals scored / conceded per team, with a prior pulling towards the average
+        average_goals = np.average(np.concatenate([home_goals, away_goals]), weights=np.concatenate([weights, weights]))
+        prior = self.prior_goals
+        scored = per_team(home, weights * home_goals) + per_team(away, weights * away_goals) + prior * average_goals
+        conceded = per_team(away, weights * home_goals) + per_team(home, weights * away_goals) + prior * average_goals
+        total_home_goals = np.sum(weights * home_goals)
+
+        attack = np.ones(size)
+        defence = np.ones(size)
+        home_advantage = 1.0
+        for _ in range(FIT_ITERATIONS):
+            previous = attack.copy()
+            attack = scored / (
+                per_team(home, weights * defence[away] * home_advantage)
+                + per_team(away, weights * defence[home]) + prior
+            )
+            defence = conceded / (
+                per_team(away, weights * attack[home] * home_advantage)
+                + per_team(home, weights * attack[away]) + prior
+            )
+            home_advantage = total_home_goals / np.sum(weights * attack[home] * defence[away])
+            # Pin the scale: average attack of 1
+            scale = attack.mean()
+            attack, defence = attack / scale, defence * scale
+            if np.max(np.abs(attack - previous)) < FIT_TOLERANCE:
+                break
+
+        self.attack, self.defence, self.home_advantage = attack, defence, home_advantage
+
+        # Pick rho by maximising the weighted Dixon-Coles log-likelihood term over a grid
+        home_rates = attack[home] * defence[away] * home_advantage
+        away_rates = attack[away] * defence[home]
+        tau = dixon_coles_tau(
+            home_goals[None, :], away_goals[None, :], home_rates[None, :], away_rates[None, :], RHO_GRID[:, None]
+        )
+        valid = np.all(tau > 0, axis=1)
+        loglik = np.where(valid, np.sum(weights[None, :] * np.log(np.clip(tau, 1e-12, None)), axis=1), -np.inf)
+        self.rho = float(RHO_GRID[np.argmax(loglik)])
+        return self
+
+    def rates(self, home_ids, away_ids):
+        """Expected goals for each fixture; unknown teams get league-average strengths"""
+        def lookup(values, team_ids):
+            default = values.mean() if len(values) else 1.0
+            return np.array([values[self.positions[int(t)]] if int(t) in self.positions else default for t in team_ids])
+
+        home_rates = lookup(self.attack, home_ids) * lookup(self.defence, away_ids) * self.home_advantage
+        away_rates = lookup(self.attack, away_ids) * lookup(self.defence, home_ids)
+        return home_rates, away_rates
+
+    def predict(self, home_ids, away_ids):
+        """Scoreline matrices and market probabilities for many fixtures at once.
+
+        Returns a dict of arrays, one entry per fixture: expected goals,
+        1X2, BTTS, over/under 2.5 and the most likely scoreline.
+        """
+        home_rates, away_rates = self.rates(home_ids, away_ids)
+        goals = np.arange(MAX_GOALS + 1)
+
+        # (fixtures, home goals, away goals)
+        scores = poisson_pmf(home_rates)[:, :, None] * poisson_pmf(away_rates)[:, None, :]
+        scores = scores * dixon_coles_tau(
+            goals[None, :, None], goals[None, None, :],
+            home_rates[:, None, None], away_rates[:, None, None], self.rho
+        )
+        scores /= scores.sum(axis=(1, 2), keepdims=True)
+
+        total_goals = goals[:, None] + goals[None, :]
+        best = scores.reshape(len(scores), -1).argmax(axis=1)
+        return {
+            'home_xg': home_rates,
+            'away_xg': away_rates,
+            'home_win': np.tril(scores, -1).sum(axis=(1, 2)),
+            'draw': np.trace(scores, axis1=1, axis2=2),
+            'away_win': np.triu(scores, 1).sum(axis=(1, 2)),
+            'btts': scores[:, 1:, 1:].sum(axis=(1, 2)),
+            'over_2_5': scores[:, total_goals > 2].sum(axis=1),
+            'under_2_5': scores[:, total_goals <= 2].sum(axis=1),
+            'likely_home_goals': best // (MAX_GOALS + 1),
+            'likely_away_goals': best % (MAX_GOALS + 1),
+            'scores': scores,
+        }
+
+    @staticmethod
+    def fixture_markets(prediction, i):
+        """Plain-float market probabilities for fixture i of a predict() result"""
+        return {
+            'home_xg': round(float(prediction['home_xg'][i]), 2),
+            'away_xg': round(float(prediction['away_xg'][i]), 2),
+            'home_win': round(float(prediction['home_win'][i]), 3),
+            'draw': round(float(prediction['draw'][i]), 3),
+            'away_win': round(float(prediction['away_win'][i]), 3),
+            'btts': round(float(prediction['btts'][i]), 3),
+            'over_2_5': round(float(prediction['over_2_5'][i]), 3),
+            'under_2_5': round(float(prediction['under_2_5'][i]), 3),
+            'likely_score': f"{prediction['likely_home_goals'][i]} - {prediction['likely_away_goals'][i]}",
+        }
+
+
+def describe_markets(markets, home_team, away_team):
+    """Model probabilities as prompt/readout lines"""
+    return (
+        f"Expected goals: {home_team} {markets['home_xg']} - {markets['away_xg']} {away_team}\n"
+        f"Win probabilities: {home_team} {markets['home_win']:.0%}, draw {markets['draw']:.0%}, "
+        f"{away_team} {markets['away_win']:.0%}\n"
+        f"Over 2.5 goals: {markets['over_2_5']:.0%} | Both teams to score: {markets['btts']:.0%} | "
+        f"Most likely score: {markets['likely_score']}"
+    )
+
+
+def model_predictions(markets, home_team, away_team):
+    """Three bullet-point predictions in the same format the GPT engine returns"""
+    outcomes = [
+        (markets['home_win'], f"{home_team} to win"),
+        (markets['draw'], "Draw"),
+        (markets['away_win'], f"{away_team} to win"),
+    ]
+    probability, outcome = max(outcomes)
+    goals = (
+        f"Over 2.5 goals ({markets['over_2_5']:.0%})" if markets['over_2_5'] >= 0.5
+        else f"Under 2.5 goals ({markets['under_2_5']:.0%})"
+    )
+    btts = (
+        f"Both teams to score ({markets['btts']:.0%})" if markets['btts'] >= 0.5
+        else f"At least one team kept scoreless ({1 - markets['btts']:.0%})"
+    )
+    return "\n".join([
+        f"- {outcome} ({probability:.0%}), most likely score {markets['likely_score']}",
+        f"- {goals}",
+        f"- {btts}",
+    ])
@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import metrics
+
+# Location of the prediction cache (override with PREDICTION_CACHE_PATH)
+CACHE_PATH = os.getenv('PREDICTION_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.prediction_cache.sqlite'))
+
+# Maximum number of stored predictions before the least recently used are evicted
+MAX_ENTRIES = int(os.getenv('PREDICTION_CACHE_SIZE', '5000'))
+
+
+def prediction_key(model, template, *parts):
+    """Content hash of everything that determines an LLM answer"""
+    digest = hashlib.sha256()
+    for part in (model, template, *parts):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Persistent LRU cache of LLM predictions keyed on a hash of their inputs"""
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS predictions (
+                key TEXT PRIMARY KEY,
+                prediction TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_access ON predictions (last_access)")
+        self.conn.commit()
+
+    def get(self, key):
+        return self.get_any((key,))
+
+    def get_any(self, keys):
+        """The prediction stored under the first of keys that has one; counted as a single hit or miss"""
+        with self.lock:
+            for key in keys:
+                row = self.conn.execute("SELECT prediction FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    break
+            else:
+                self.misses += 1
+                metrics.PREDICTION_CACHE.inc(result='miss')
+                return None
+            self.hits += 1
+            metrics.PREDICTION_CACHE.inc(result='hit')
+            self.conn.execute(
+                "UPDATE predictions SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (time.time(), key)
+            )
+            self.conn.commit()
+            return row[0]
+
+    def set(self, key, prediction):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO predictions (key, prediction, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, prediction, now, now)
+            )
+            # Evict the least recently used entries beyond the cap
+            self.conn.execute(
+                """DELETE FROM predictions WHERE key IN (
+                       SELECT key FROM predictions ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                   )""",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def invalidate(self, key=None):
+        """Drop one prediction, or all of them; returns the number removed"""
+        with self.lock:
+            if key is None:
+                cursor = self.conn.execute("DELETE FROM predictions")
+            else:
+                cursor = self.conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+            self.conn.commit()
+            return cursor.rowcount
+
+    def stats(self):
+        with self.lock:
+            entries, total_hits = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM predictions"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                'lifetime_hits': total_hits,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """Return the process-wide prediction cache, or None if disabled"""
+    global _default_cache
+    if os.getenv('PREDICTION_CACHE_DISABLED'):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PredictionCache()
+    return _default_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the cached LLM predictions")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="Show the number of cached predictions")
+    subparsers.add_parser('clear', help="Invalidate every cached prediction")
+
+    args = parser.parse_args()
+    cache = PredictionCache()
+
+    if args.command == 'clear':
+        print(f"Removed {cache.invalidate()} cached prediction(s)")
+    else:
+        stats = cache.stats()
+        print(f"entries: {stats['entries']} / {stats['max_entries']}")
+        print(f"lifetime hits: {stats['lifetime_hits']}")
+
+
+if __name__ == "__main__":
+    main()
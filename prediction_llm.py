@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+
+import metrics
+import tracing
+from prediction_cache import get_prediction_cache, prediction_key
+
+# Model used for every prediction request
+MODEL = os.getenv('PREDICTION_MODEL', 'gpt-4o-mini')
+
+# Maximum number of LLM requests in flight at once
+DEFAULT_CONCURRENCY = int(os.getenv('LLM_CONCURRENCY', '4'))
+
+SYSTEM_PROMPT = "You are a football prediction expert. Provide exactly 3 bullet-point predictions. No explanations or analysis."
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a football prediction expert. For every fixture you are given, provide exactly 3 predictions. "
+    "No explanations or analysis. Respond with JSON only."
+)
+
+PROMPT_TEMPLATE = """Based on the following match data and head-to-head history for {team1} vs {team2}:
+
+{match_data}
+
+Using only the statistical and factual data provided, provide exactly 3 highly probable predictions for this match.
+
+Requirements:
+1. Each prediction must be directly supported by the data shown
+2. Format as exactly 3 bullet points
+3. Keep each prediction concise (max 15 words)
+4. Focus on concrete outcomes (goals, win/loss, scoring patterns)
+5. No explanations or analysis - just the predictions
+
+Example format:
+- Team A to win based on superior head-to-head record
+- Over 2.5 goals to be scored in the match
+- Both teams to score at least one goal"""
+
+BATCH_PROMPT_TEMPLATE = """Below is match data and head-to-head history for {count} fixtures.
+
+Using only the statistical and factual data provided, give exactly 3 highly probable predictions for each fixture.
+
+Requirements:
+1. Each prediction must be directly supported by that fixture's data
+2. Keep each prediction concise (max 15 words)
+3. Focus on concrete outcomes (goals, win/loss, scoring patterns)
+4. No explanations or analysis - just the predictions
+
+Return a JSON object of the form:
+{{"fixtures": [{{"id": <fixture id>, "predictions": ["...", "...", "..."]}}]}}
+
+{fixtures}"""
+
+
+def build_prompt(team1_name, team2_name, match_data):
+    return PROMPT_TEMPLATE.format(team1=team1_name, team2=team2_name, match_data=match_data)
+
+
+def build_batch_prompt(items):
+    """items: list of (team1_name, team2_name, match_data)"""
+    blocks = [
+        f"### Fixture {i}: {team1} vs {team2}\n{match_data}"
+        for i, (team1, team2, match_data) in enumerate(items, 1)
+    ]
+    return BATCH_PROMPT_TEMPLATE.format(count=len(items), fixtures="\n\n".join(blocks))
+
+
+class TokenBudgetExceeded(Exception):
+    pass
+
+
+class LLMUsage:
+    """Thread-safe tally of LLM requests, latency and token usage"""
+
+    def __init__(self, token_budget=None):
+        self.token_budget = token_budget
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies = []
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+
+    def check_budget(self):
+        if self.token_budget is not None and self.total_tokens >= self.token_budget:
+            raise TokenBudgetExceeded(f"token budget of {self.token_budget} exhausted")
+
+    def record(self, latency, usage=None, error=False):
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            if error:
+                self.errors += 1
+            if usage is not None:
+                self.prompt_tokens += usage.prompt_tokens or 0
+                self.completion_tokens += usage.completion_tokens or 0
+
+    def summary(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'total_tokens': self.total_tokens,
+                'total_latency': round(sum(latencies), 3),
+                'avg_latency': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                'p95_latency': round(latencies[int(0.95 * (len(latencies) - 1))], 3) if latencies else 0.0,
+            }
+
+
+def openai_client():
+    """An OpenAI client for OPENAI_API_KEY (the openai package takes most of a second to import)"""
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+
+class PredictionLLM:
+    """Sends prediction prompts to OpenAI, one fixture per request or packed into batches"""
+
+    def __init__(self, client=None, model=MODEL, concurrency=DEFAULT_CONCURRENCY, token_budget=None, use_cache=True):
+        self._client = client  # created by openai_client() on the first request when not given
+        self.client_lock = threading.Lock()
+        self.model = model
+        self.cache = get_prediction_cache() if use_cache else None
+        self.semaphore = threading.BoundedSemaphore(max(1, concurrency))
+        self.usage = LLMUsage(token_budget)
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self.client_lock:
+                if self._client is None:
+                    self._client = openai_client()
+        return self._client
+
+    def complete(self, messages, **kwargs):
+        """One chat completion, bounded by the semaphore and recorded in self.usage"""
+        self.usage.check_budget()
+        with self.semaphore:
+            start = time.perf_counter()
+            try:
+                with tracing.span('openai_request', model=self.model):
+                    response = self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+            except Exception:
+                self.usage.record(time.perf_counter() - start, error=True)
+                metrics.LLM_REQUESTS.inc(model=self.model, status='error')
+                raise
+            latency = time.perf_counter() - start
+            self.usage.record(latency, response.usage)
+            metrics.LLM_REQUESTS.inc(model=self.model, status='ok')
+            metrics.LLM_LATENCY.observe(latency, model=self.model)
+            if response.usage is not None:
+                metrics.LLM_TOKENS.inc(response.usage.prompt_tokens or 0, model=self.model, kind='prompt')
+                metrics.LLM_TOKENS.inc(response.usage.completion_tokens or 0, model=self.model, kind='completion')
+        return response.choices[0].message.content.strip()
+
+    def cached(self, key, compute):
+        """Return the stored prediction for key, or compute and store it"""
+        if self.cache is not None:
+            prediction = self.cache.get(key)
+            if prediction is not None:
+                return prediction
+        prediction = compute()
+        if self.cache is not None:
+            self.cache.set(key, prediction)
+        return prediction
+
+    def single_key(self, team1_name, team2_name, match_data):
+        return prediction_key(self.model, SYSTEM_PROMPT + PROMPT_TEMPLATE, team1_name, team2_name, match_data)
+
+    def batch_key(self, team1_name, team2_name, match_data):
+        return prediction_key(self.model, BATCH_SYSTEM_PROMPT + BATCH_PROMPT_TEMPLATE, team1_name, team2_name, match_data)
+
+    def request_single(self, team1_name, team2_name, match_data):
+        """Send one single-fixture request (no cache lookup)"""
+        return self.complete([
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": build_prompt(team1_name, team2_name, match_data)}
+        ])
+
+    def predict(self, team1_name, team2_name, match_data):
+        """Predictions for a single fixture as a bullet-point string"""
+        return self.cached(self.single_key(team1_name, team2_name, match_data),
+                           lambda: self.request_single(team1_name, team2_name, match_data))
+
+    def predict_batch(self, items):
+        """Predictions for several fixtures in one JSON-mode request.
+
+        items: list of (team1_name, team2_name, match_data). Returns a list of
+        bullet-point strings in the same order. Fixtures with a cached answer
+        (batched or single) are not sent at all; fixtures the model skipped or
+        answered malformed are retried one at a time. Every answer is stored
+        under the fixture's batch key, so a rerun of the same batch is all hits.
+        """
+        keys = [self.batch_key(*item) for item in items]
+        results = [
+            self.cache.get_any((key, self.single_key(*item))) if self.cache is not None else None
+            for key, item in zip(keys, items)
+        ]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        answers = {}
+        if len(missing) > 1:
+            answers = self.request_batch([items[i] for i in missing])
+        for position, i in enumerate(missing, 1):
+            results[i] = answers.get(position)
+            if not results[i]:
+                results[i] = self.request_single(*items[i])
+                if self.cache is not None:
+                    self.cache.set(self.single_key(*items[i]), results[i])
+            if self.cache is not None:
+                self.cache.set(keys[i], results[i])
+        return results
+
+    def request_batch(self, items):
+        """Send one packed request; returns {fixture position (1-based): bullet-point string}"""
+        content = self.complete(
+            [
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": build_batch_prompt(items)}
+            ],
+            response_format={"type": "json_object"}
+        )
+
+        answers = {}
+        try:
+            for fixture in json.loads(content).get('fixtures', []):
+                predictions = fixture.get('predictions')
+                if isinstance(predictions, list) and predictions:
+                    answers[int(fixture['id'])] = "\n".join(f"- {p.strip().lstrip('- ')}" for p in predictions[:3])
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return {}
+        return answers
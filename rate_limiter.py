@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+
+# Requests per minute allowed by the account tier (free tier is 10)
+DEFAULT_RATE_LIMIT = int(os.getenv('FOOTBALL_DATA_RATE_LIMIT', '10'))
+
+# Only report waits longer than this many seconds
+WAIT_REPORT_THRESHOLD = 1.0
+
+
+class RateLimiter:
+    """Token bucket that queues callers instead of letting them hit HTTP 429.
+
+    The bucket holds up to `rate_per_minute` tokens and refills continuously.
+    Callers reserve a token in arrival order; when the bucket is empty the
+    balance goes negative and each caller sleeps until its own slot comes up,
+    so queued requests are spaced out evenly. The server's own view of the
+    quota (X-Requests-Available-Minute / X-RequestCounter-Reset / Retry-After)
+    always overrides the local estimate.
+    """
+
+    def __init__(self, rate_per_minute=DEFAULT_RATE_LIMIT, verbose=True):
+        self.capacity = float(rate_per_minute)
+        self.refill_rate = rate_per_minute / 60.0  # tokens per second
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.verbose = verbose
+        self.lock = threading.Lock()
+
+        # Visibility into the scheduler
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.updated_at = now
+
+    def reserve(self):
+        """Take a token now and return how long the caller must wait before sending"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens / self.refill_rate, self.blocked_until - now)
+            self.requests += 1
+            if wait > 0:
+                self.queue_depth += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+                queued = self.queue_depth
+
+        if wait > 0 and self.verbose and wait >= WAIT_REPORT_THRESHOLD:
+            print(f"Rate limit: waiting {wait:.1f}s ({queued} request(s) queued)")
+        return wait
+
+    def _waited(self, wait):
+        with self.lock:
+            self.queue_depth -= 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def acquire(self):
+        """Block until the caller may send one request; returns the time waited"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+            self._waited(wait)
+        return wait
+
+    async def acquire_async(self):
+        """acquire() for coroutines: waits on the event loop instead of blocking the thread"""
+        import asyncio
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+            self._waited(wait)
+        return wait
+
+    def update_from_headers(self, headers):
+        """Sync the bucket with the quota the server reports"""
+        available = headers.get('X-Requests-Available-Minute')
+        reset = headers.get('X-RequestCounter-Reset')
+        if available is None:
+            return
+
+        try:
+            available = int(available)
+            reset = float(reset) if reset is not None else None
+        except ValueError:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Never believe we have more headroom than the server says
+            self.tokens = min(self.tokens, float(available))
+            if available <= 0 and reset is not None:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+    def penalize(self, seconds):
+        """Hold every caller back for `seconds` (used for 429 / Retry-After)"""
+        with self.lock:
+            now = time.monotonic()
+            self.throttled += 1
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def stats(self):
+        """Snapshot of queue depth and wait times"""
+        with self.lock:
+            return {
+                'rate_per_minute': self.capacity,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'total_wait': round(self.total_wait, 3),
+                'max_wait': round(self.max_wait, 3),
+                'avg_wait': round(self.total_wait / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+def retry_delay(response, default):
+    """Seconds to wait after a 429, taken from Retry-After or the counter reset"""
+    for header in ('Retry-After', 'X-RequestCounter-Reset'):
+        value = response.headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            continue
+    return default
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+# Seconds a successful response is reused within a run, even with the response cache off
+# (override with FOOTBALL_MEMO_TTL; 0 keeps only the in-flight sharing)
+MEMO_TTL = float(os.getenv('FOOTBALL_MEMO_TTL', '600'))
+
+# Most responses kept in memory at once, least recently used dropped first (override with FOOTBALL_MEMO_SIZE)
+MEMO_SIZE = int(os.getenv('FOOTBALL_MEMO_SIZE', '2048'))
+
+_MISSING = object()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical requests: one call per key is ever in flight.
+
+    Callers asking for a key that is already being fetched wait for that
+    call and get its result (or its exception) instead of sending their own.
+    Results that `remember` accepts are then memoized for memo_ttl seconds,
+    so repeated lookups within a run are answered from memory. The shared
+    results are the same objects for every caller and must be treated as
+    read-only. Threads use do(), coroutines do_async(); both share the memo.
+    """
+
+    def __init__(self, memo_ttl=MEMO_TTL, memo_size=MEMO_SIZE):
+        self.memo_ttl = memo_ttl
+        self.memo_size = memo_size
+        self.lock = threading.Lock()
+        self.inflight = {}  # key -> _Call
+        self.inflight_async = {}  # (event loop, key) -> asyncio.Future
+        self.memo = OrderedDict()  # key -> (expires_at, value)
+        self.calls = 0
+        self.shared = 0
+        self.memo_hits = 0
+
+    def _memoized(self, key):
+        """Memoized value for key, or _MISSING; caller holds the lock"""
+        entry = self.memo.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.memo[key]
+            return _MISSING
+        self.memo.move_to_end(key)
+        self.memo_hits += 1
+        return value
+
+    def _remember(self, key, value):
+        if self.memo_ttl <= 0:
+            return
+        with self.lock:
+            self.memo[key] = (time.monotonic() + self.memo_ttl, value)
+            self.memo.move_to_end(key)
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+
+    def do(self, key, fn, remember=lambda value: True):
+        """Return fn()'s result for key, sharing an in-flight or memoized call when there is one"""
+        with self.lock:
+            value = self._memoized(key)
+            if value is not _MISSING:
+                metrics.API_COALESCED.inc(kind='memo')
+                return value
+            call = self.inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self.inflight[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            metrics.API_COALESCED.inc(kind='shared')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            if remember(call.value):
+                self._remember(key, call.value)
+        finally:
+            with self.lock:
+                del self.inflight[key]
+            call.done.set()
+        return call.value
+
+    async def do_async(self, key, fn, remember=lambda value: True):
+        """do() for coroutines: fn is an async function, waiting callers await the same future"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            value = self._memoized(key)
+            if value is not _MISSING:
+                metrics.API_COALESCED.inc(kind='memo')
+                return value
+            future = self.inflight_async.get((loop, key))
+            leader = future is None
+            if leader:
+                future = self.inflight_async[(loop, key)] = loop.create_future()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            metrics.API_COALESCED.inc(kind='shared')
+            return await asyncio.shield(future)
+
+        try:
+            value = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here, so a call nobody shared doesn't log a warning
+            raise
+        else:
+            future.set_result(value)
+            if remember(value):
+                self._remember(key, value)
+        finally:
+            with self.lock:
+                del self.inflight_async[(loop, key)]
+        return value
+
+    def clear(self):
+        """Forget memoized results (e.g. between runs of a long-lived process)"""
+        with self.lock:
+            self.memo.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'calls': self.calls,
+                'shared': self.shared,
+                'memo_hits': self.memo_hits,
+                'memoized': len(self.memo),
+            }
+
@@ -0,0 +1,228 @@
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+from api_client import get_client
+from cache import TTL_TEAMS
+from leagues import LEAGUE_IDS
+
+# Where the resolved team directory is kept between runs (override with TEAM_DIRECTORY_PATH)
+DIRECTORY_PATH = os.getenv('TEAM_DIRECTORY_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.team_directory.json'))
+
+# Bumped when the saved format changes; older directories are rebuilt
+DIRECTORY_VERSION = 2
+
+# Minimum trigram similarity (0-1) for a fuzzy match to be accepted
+FUZZY_THRESHOLD = 0.45
+
+# Club-type tokens that carry no identifying information
+NOISE_TOKENS = {'fc', 'afc'}
+
+NON_ALNUM = re.compile(r'[^a-z0-9 ]+')
+
+
+def normalize(name):
+    """Casefold, strip accents and punctuation, and drop FC/AFC tokens"""
+    name = unicodedata.normalize('NFKD', name.casefold())
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    name = NON_ALNUM.sub(' ', name.replace('&', ' and '))
+    tokens = [token for token in name.split() if token not in NOISE_TOKENS]
+    return ' '.join(tokens)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TeamResolver:
+    """Constant-time team-name -> team-ID lookup with a trigram fuzzy fallback.
+
+    An alias claimed by two different teams (a short name or TLA used in two
+    competitions, say) is never answered from the shared map. It only
+    resolves within a scope of team IDs, such as the current league's teams.
+    """
+
+    def __init__(self, path=DIRECTORY_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.aliases = {}      # normalized alias -> team ID
+        self.grams = {}        # trigram -> set of normalized aliases
+        self.alias_grams = {}  # normalized alias -> its trigram count
+        self.contested = {}    # normalized alias -> IDs of every team claiming it
+        self.directory_loaded = False
+        self.load()
+
+    def add_alias(self, alias, team_id):
+        key = normalize(alias)
+        team_id = int(team_id)
+        if not key:
+            return
+        if key in self.contested:
+            self.contested[key].add(team_id)
+            return
+        current = self.aliases.get(key)
+        if current == team_id:
+            return
+        if current is not None:
+            self.contest(key, {current, team_id})
+            return
+        self.aliases[key] = team_id
+        grams = trigrams(key)
+        self.alias_grams[key] = len(grams)
+        for gram in grams:
+            self.grams.setdefault(gram, set()).add(key)
+
+    def contest(self, key, team_ids):
+        """Take an alias out of the shared map because more than one team claims it"""
+        self.contested[key] = set(team_ids)
+        if self.aliases.pop(key, None) is not None:
+            del self.alias_grams[key]
+            for gram in trigrams(key):
+                self.grams[gram].discard(key)
+
+    def add_aliases(self, aliases):
+        """Add a {name: team_id} mapping such as utils.TEAM_IDS"""
+        with self.lock:
+            for alias, team_id in aliases.items():
+                self.add_alias(alias, team_id)
+
+    def add_teams(self, teams):
+        """Add API team objects (name, shortName, tla)"""
+        with self.lock:
+            for team in teams:
+                for field in ('name', 'shortName', 'tla'):
+                    if team.get(field):
+                        self.add_alias(team[field], team['id'])
+
+    def fuzzy(self, key):
+        """Best alias by trigram Jaccard similarity, or None below the threshold"""
+        query = trigrams(key)
+        shared = Counter()
+        for gram in query:
+            for alias in self.grams.get(gram, ()):
+                shared[alias] += 1
+        best, best_score = None, 0.0
+        for alias, count in shared.items():
+            score = count / (len(query) + self.alias_grams[alias] - count)
+            if score > best_score:
+                best, best_score = alias, score
+        if best_score >= FUZZY_THRESHOLD:
+            return self.aliases[best]
+        return None
+
+    def lookup(self, key, scope=None):
+        """Exact lookup; a contested alias only resolves to the one claimant inside scope"""
+        team_id = self.aliases.get(key)
+        if team_id:
+            return team_id
+        claims = self.contested.get(key)
+        if claims and scope is not None:
+            in_scope = claims.intersection(scope)
+            if len(in_scope) == 1:
+                return next(iter(in_scope))
+        return None
+
+    def resolve(self, team_name, fetch=True, scope=None):
+        """Get a team ID for a name; only downloads the directory if it isn't on disk yet.
+
+        scope (team IDs, e.g. the current league's) picks between teams that share an alias.
+        """
+        key = normalize(team_name)
+        if not key:
+            return None
+
+        team_id = self.lookup(key, scope)
+        if team_id:
+            return team_id
+
+        if fetch and not self.directory_loaded:
+            self.build_directory()
+            team_id = self.lookup(key, scope)
+            if team_id:
+                return team_id
+
+        if key in self.contested:
+            print(f"Team name '{team_name}' is shared by teams {sorted(self.contested[key])}; use the full name")
+            return None
+
+        with self.lock:
+            team_id = self.fuzzy(key)
+        if team_id:
+            # Remember the spelling so the next lookup is a plain dict hit
+            with self.lock:
+                self.add_alias(team_name, team_id)
+        return team_id
+
+    def build_directory(self, competition_ids=None):
+        """Load teams for every competition in LEAGUE_IDS and persist them"""
+        with self.build_lock:
+            if self.directory_loaded and competition_ids is None:
+                return
+            client = get_client()
+            for competition_id in competition_ids or LEAGUE_IDS.values():
+                try:
+                    response = client.get(f"/competitions/{competition_id}/teams")
+                except Exception as e:
+                    print(f"Error fetching teams for competition {competition_id}: {str(e)}")
+                    continue
+                if response.status_code == 200:
+                    self.add_teams(response.json().get('teams', []))
+            self.directory_loaded = True
+            self.save()
+
+    def load(self):
+        """Read the persisted directory if it is still fresh"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != DIRECTORY_VERSION or time.time() - data.get('built_at', 0) > TTL_TEAMS:
+            return
+        with self.lock:
+            for key, team_ids in data.get('contested', {}).items():
+                self.contest(key, team_ids)
+            for alias, team_id in data.get('aliases', {}).items():
+                self.add_alias(alias, team_id)
+            self.directory_loaded = True
+
+    def save(self):
+        with self.lock:
+            data = {
+                'version': DIRECTORY_VERSION,
+                'built_at': time.time(),
+                'aliases': dict(self.aliases),
+                'contested': {key: sorted(team_ids) for key, team_ids in self.contested.items()},
+            }
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except OSError as e:
+            print(f"Could not save team directory: {str(e)}")
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+_seeded = set()  # sources whose aliases have been added
+
+
+def get_resolver(aliases=None, source=None):
+    """Return the process-wide team resolver, seeding it with an alias dict once per source name"""
+    global _resolver
+    if aliases is not None and source is None:
+        raise ValueError("get_resolver needs a source name to seed aliases")
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = TeamResolver()
+        seed = aliases is not None and source not in _seeded
+        if seed:
+            _seeded.add(source)
+    if seed:
+        _resolver.add_aliases(aliases)
+    return _resolver
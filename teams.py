@@ -1,4 +1,4 @@
-import requests
+from api_client import get_client
 
 def get_teams(league_code, api_token):
     """
@@ -11,13 +11,11 @@ def get_teams(league_code, api_token):
     Returns:
     list: A list of dictionaries with team IDs and names.
     """
-    url = f"https://api.football-data.org/v4/competitions/{league_code}/teams"
-    headers = {
-        "X-Auth-Token": api_token
-    }
-    
-    response = requests.get(url, headers=headers)
-    
+    response = get_client(api_token).get(f"/competitions/{league_code}/teams")
+    return teams_from_response(response)
+
+def teams_from_response(response):
+    """Team IDs and names from a /competitions/{id}/teams response (shared with async_client)"""
     if response.status_code == 200:
         data = response.json()
         teams = [
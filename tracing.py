@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import metrics
+
+# Write a Chrome trace (chrome://tracing, Perfetto, speedscope) here at the end of a run
+TRACE_FILE = os.getenv('TRACE_FILE')
+
+# Seconds between profiler samples
+PROFILE_INTERVAL = 0.005
+
+
+class Tracer:
+    """Collects timed spans as Chrome trace-event "complete" events.
+
+    Disabled tracers record nothing, so spans can stay in the code paths
+    permanently. Every span carries its arguments (league, fixture and team
+    IDs) and the thread it ran on, so parallel fixtures show up as separate
+    lanes in the viewer.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.events = []
+        self.threads = {}
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            thread = threading.current_thread()
+            event = {
+                'name': name,
+                'ph': 'X',
+                'ts': round((start - self.origin) * 1e6, 1),
+                'dur': round((end - start) * 1e6, 1),
+                'pid': os.getpid(),
+                'tid': thread.ident,
+                'args': {key: str(value) for key, value in args.items()},
+            }
+            with self.lock:
+                self.events.append(event)
+                self.threads[thread.ident] = thread.name
+
+    def trace(self):
+        with self.lock:
+            names = [
+                {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                for tid, name in self.threads.items()
+            ]
+            return {'traceEvents': names + list(self.events), 'displayTimeUnit': 'ms'}
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
+
+
+TRACER = Tracer(enabled=bool(TRACE_FILE))
+
+
+def span(name, **args):
+    """Trace a block as one span"""
+    return TRACER.span(name, **args)
+
+
+@contextmanager
+def stage(name, **args):
+    """Trace a prediction stage and record its duration in metrics.STAGE_SECONDS"""
+    with TRACER.span(name, **args), metrics.STAGE_SECONDS.time(stage=name):
+        yield
+
+
+def enable():
+    TRACER.enabled = True
+
+
+def export(path=None):
+    """Write the trace to path (default TRACE_FILE) if tracing was on"""
+    path = path or TRACE_FILE
+    if path and TRACER.enabled:
+        TRACER.write(path)
+        print(f"Trace written to {path}")
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval.
+
+    The output is in folded-stack format (one "root;...;leaf count" line per
+    distinct stack), which flamegraph.pl, inferno and speedscope turn
+    straight into a flame graph. Sampling all threads keeps the overhead low
+    and shows time spent waiting on the network as well as on the CPU.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self.running = False
+        self.thread = None
+
+    @staticmethod
+    def _frame_name(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+    def _sample(self):
+        own = threading.get_ident()
+        while self.running:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Profile written to {path} ({sum(self.samples.values())} samples)")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+@contextmanager
+def profiled(path, interval=PROFILE_INTERVAL):
+    """Sample the block and write folded stacks to path; a no-op when path is None"""
+    if not path:
+        yield
+        return
+    profiler = SamplingProfiler(interval).start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        profiler.write(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a script with tracing and/or sampling profiling, e.g. "
+                    "python tracing.py --trace trace.json --profile run.folded batch_predict.py \"La Liga\""
+    )
+    parser.add_argument('--trace', help="Write a Chrome trace of the run's spans to this file")
+    parser.add_argument('--profile', help="Write folded stacks (flame graph input) to this file")
+    parser.add_argument('--interval', type=float, default=PROFILE_INTERVAL, help="Seconds between profiler samples")
+    parser.add_argument('script', help="Python script to run")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Arguments for the script")
+    args = parser.parse_args()
+
+    # Spans are recorded by the imported module, not this __main__ copy of it
+    import tracing
+    if args.trace:
+        tracing.enable()
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    try:
+        with profiled(args.profile, args.interval):
+            runpy.run_path(args.script, run_name='__main__')
+    finally:
+        tracing.export(args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,28 @@
+import os
 import requests
+from api_client import get_client
+from match_record import project
+from pair_index import find_match_id
+from team_resolver import get_resolver
+import tracing
 from datetime import datetime, timedelta
-import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+def load_env():
+    """Load the nearest .env (this directory or a parent) into os.environ; python-dotenv is only imported when one exists"""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
 
-# Constants
-BASE_URL = 'http://api.football-data.org/v4'
-FOOTBALL_API_KEY = os.getenv('FOOTBALL_DATA_API_KEY')
-HEADERS = {'X-Auth-Token': FOOTBALL_API_KEY}
+# Load environment variables
+load_env()
 
 # Team ID mappings
 TEAM_IDS = {
@@ -37,146 +50,136 @@ TEAM_IDS = {
 
 def get_team_id(team_name):
     """Get team ID with fuzzy matching fallback"""
-    team_name_lower = team_name.lower()
-    
-    # Direct match
-    if team_name_lower in TEAM_IDS:
-        return TEAM_IDS[team_name_lower]
-        
-    # Partial match
-    for known_name, team_id in TEAM_IDS.items():
-        if team_name_lower in known_name or known_name in team_name_lower:
-            return team_id
-            
-    # Fallback to API search if still no match
-    url = f"{BASE_URL}/teams"
-    response = requests.get(url, headers=HEADERS)
-    
-    if response.status_code == 200:
-        teams = response.json()['teams']
-        for team in teams:
-            if team_name.lower() in team['name'].lower():
-                return team['id']
-    return None
+    return get_resolver(TEAM_IDS, 'utils.TEAM_IDS').resolve(team_name)
 
-def get_team_matches(team_id, days_back=90):
-    """Get detailed match history for a team"""
-    date_from = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
-    date_to = datetime.now().strftime('%Y-%m-%d')
+def fetch_team_matches(team_id, days_back=90, store=None):
+    """Get a team's finished matches as MatchRecords (from the local MatchStore when one is given)"""
+    if store is not None:
+        date_from = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        return store.team_matches(team_id, date_from, tomorrow)
     
-    url = f"{BASE_URL}/teams/{team_id}/matches"
-    params = {
-        'dateFrom': date_from,
-        'dateTo': date_to,
+    response = get_client().get(f"/teams/{team_id}/matches", params=finished_params(days_back))
+    return team_matches_from_response(response, team_id)
+
+def finished_params(days_back=90):
+    """Query parameters for finished matches over the last days_back days"""
+    return {
+        'dateFrom': (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d'),
+        'dateTo': datetime.now().strftime('%Y-%m-%d'),
         'status': 'FINISHED'
     }
+
+def team_matches_from_response(response, team_id):
+    if response.status_code == 200:
+        return project(response.json()['matches'])
+    print(f"API Error: could not fetch matches for team {team_id} (status {response.status_code})")
+    return []
+
+def get_team_matches(team_id, days_back=90, store=None):
+    """Get detailed match history for a team"""
+    return played_matches(fetch_team_matches(team_id, days_back, store))
+
+def played_matches(matches):
+    """Match history: the MatchRecords that have a score (results are read with record.result_for)"""
+    return [match for match in matches if match.played]
+
+HISTORY_HEADERS = ['date', 'competition', 'home_team', 'away_team', 'score', 'result']
+
+def history_rows(matches, team_id):
+    """Match history as table rows from team_id's point of view, for display (see HISTORY_HEADERS)"""
+    return [
+        [match.day, match.competition, match.home_name, match.away_name, match.score, match.result_for(team_id)]
+        for match in matches
+    ]
+
+H2H_HEADERS = ['date', 'competition', 'home_team', 'away_team', 'score', 'venue']
+
+def h2h_rows(matches):
+    """Head-to-head matches as table rows, for display (see H2H_HEADERS)"""
+    return [
+        [match.day, match.competition, match.home_name, match.away_name, match.score, match.venue or 'Unknown']
+        for match in matches
+    ]
+
+
+def get_competition_matches(competition_id, days_back=90, store=None):
+    """Get every finished match in a competition over the last days_back days (one API call)"""
+    if store is not None:
+        return store.competition_matches(
+            competition_id,
+            (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d'),
+            (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        )
     
-    response = requests.get(url, headers=HEADERS, params=params)
-    
+    response = get_client().get(f"/competitions/{competition_id}/matches", params=finished_params(days_back))
+    return competition_matches_from_response(response, competition_id)
+
+def competition_matches_from_response(response, competition_id):
     if response.status_code == 200:
-        matches = response.json()['matches']
-        match_history = []
-        
-        for match in matches:
-            date = datetime.strptime(match['utcDate'], '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d')
-            home_team = match['homeTeam']['name']
-            away_team = match['awayTeam']['name']
-            score = match['score']['fullTime']
-            competition = match['competition']['name']
-            
-            # Skip if no score (match not played)
-            if not score['home'] and not score['away']:
-                continue
-                
-            match_info = {
-                'date': date,
-                'competition': competition,
-                'home_team': home_team,
-                'away_team': away_team,
-                'score': f"{score['home']} - {score['away']}",
-                'result': get_result(match, team_id)
-            }
-            match_history.append(match_info)
-            
-        return match_history
+        data = response.json()
+        # Matches in a competition listing may omit their own competition block
+        return project(data.get('matches', []), data.get('competition'))
+    print(f"API Error: could not fetch matches for competition {competition_id} (status {response.status_code})")
     return []
 
-def get_result(match, team_id):
-    """Determine if the team won, lost, or drew the match"""
-    score = match['score']['fullTime']
-    is_home = match['homeTeam']['id'] == team_id
+def build_team_match_index(matches):
+    """Index MatchRecords by team ID, giving each team the same history get_team_matches would"""
+    index = {}
+    for match in played_matches(matches):
+        for team_id in (match.home_id, match.away_id):
+            if team_id is not None:
+                index.setdefault(team_id, []).append(match)
+    return index
+
+def get_stored_head_to_head(store, team1_id, team2_id):
+    """Build the get_head_to_head result from the local MatchStore"""
+    stored = store.head_to_head(team1_id, team2_id)
+    if not stored:
+        return None
     
-    team_score = score['home'] if is_home else score['away']
-    opponent_score = score['away'] if is_home else score['home']
+    stats = store.h2h_aggregates(team1_id, team2_id)
+    if stats is None:
+        team1_id = int(team1_id)
+        stats = {'total_matches': len(stored), 'total_goals': 0, 'team1_wins': 0, 'team2_wins': 0, 'draws': 0}
+        for match in stored:
+            stats['total_goals'] += match.home_goals + match.away_goals
+            result = match.result_for(team1_id)
+            if result == 'W':
+                stats['team1_wins'] += 1
+            elif result == 'L':
+                stats['team2_wins'] += 1
+            else:
+                stats['draws'] += 1
     
-    if team_score > opponent_score:
-        return 'W'
-    elif team_score < opponent_score:
-        return 'L'
-    else:
-        return 'D'
-
-def get_head_to_head(team1_id, team2_id):
-    """Get head to head matches between two teams"""
-    url = f"{BASE_URL}/teams/{team1_id}/matches"
-    params = {
-        'status': 'FINISHED',
-        'limit': 200
+    return {
+        'matches': stored,
+        'stats': stats
     }
+
+def get_head_to_head(team1_id, team2_id, store=None):
+    """Get head to head matches between two teams (from the local MatchStore when one is given)"""
+    if store is not None:
+        return get_stored_head_to_head(store, team1_id, team2_id)
+    
+    client = get_client()
     
     try:
-        response = requests.get(url, headers=HEADERS, params=params)
-        response.raise_for_status()
-        
-        matches = response.json()['matches']
-        match_id = None
-        
-        # Find a match between these two teams
-        for match in matches:
-            if (match['homeTeam'].get('id') == team2_id or 
-                match['awayTeam'].get('id') == team2_id):
-                match_id = match['id']
-                break
+        # Any match between the two teams unlocks the head2head endpoint
+        with tracing.span('h2h_match_id', team1=team1_id, team2=team2_id):
+            match_id = find_match_id(client, team1_id, team2_id)
         
         if not match_id:
             return None
         
         # Get head to head data using the match ID
-        url = f"{BASE_URL}/matches/{match_id}/head2head"
         params = {'limit': 60}
         
-        response = requests.get(url, headers=HEADERS, params=params)
+        with tracing.span('h2h_fetch', match=match_id, team1=team1_id, team2=team2_id):
+            response = client.get(f"/matches/{match_id}/head2head", params=params)
         response.raise_for_status()
         
-        h2h_data = response.json()
-        
-        # Process the head to head data
-        matches = []
-        for match in h2h_data['matches']:
-            match_info = {
-                'date': datetime.strptime(match['utcDate'], '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d'),
-                'competition': match['competition']['name'],
-                'home_team': match['homeTeam']['name'],
-                'away_team': match['awayTeam']['name'],
-                'score': f"{match['score']['fullTime']['home']} - {match['score']['fullTime']['away']}",
-                'venue': match.get('venue', 'Unknown')
-            }
-            matches.append(match_info)
-        
-        # Get aggregate stats
-        agg = h2h_data['aggregates']
-        stats = {
-            'total_matches': agg['numberOfMatches'],
-            'total_goals': agg['totalGoals'],
-            'team1_wins': agg['homeTeam']['wins'] if agg['homeTeam']['id'] == team1_id else agg['awayTeam']['wins'],
-            'team2_wins': agg['homeTeam']['wins'] if agg['homeTeam']['id'] == team2_id else agg['awayTeam']['wins'],
-            'draws': agg['homeTeam']['draws']
-        }
-        
-        return {
-            'matches': matches,
-            'stats': stats
-        }
+        return parse_head_to_head(response.json(), team1_id, team2_id)
         
     except requests.exceptions.RequestException as e:
         print(f"API Error: {str(e)}")
@@ -185,10 +188,28 @@ def get_head_to_head(team1_id, team2_id):
         print(f"Error processing head-to-head data: {str(e)}")
         return None
 
+def parse_head_to_head(h2h_data, team1_id, team2_id):
+    """Turn a /matches/{id}/head2head payload into the get_head_to_head result"""
+    # Process the head to head data
+    matches = project(h2h_data['matches'])
+    
+    # Get aggregate stats
+    agg = h2h_data['aggregates']
+    stats = {
+        'total_matches': agg['numberOfMatches'],
+        'total_goals': agg['totalGoals'],
+        'team1_wins': agg['homeTeam']['wins'] if agg['homeTeam']['id'] == team1_id else agg['awayTeam']['wins'],
+        'team2_wins': agg['homeTeam']['wins'] if agg['homeTeam']['id'] == team2_id else agg['awayTeam']['wins'],
+        'draws': agg['homeTeam']['draws']
+    }
+    
+    return {
+        'matches': matches,
+        'stats': stats
+    }
+
 def fetch_upcoming_matches(competition_id="2021"):
     """Fetch upcoming matches for a competition"""
-    base_url = f"{BASE_URL}/competitions/{competition_id}/matches"
-    
     # Today's date and a date range for the future
     today = datetime.today().strftime('%Y-%m-%d')
     future_date = (datetime.today().replace(year=datetime.today().year + 1)).strftime('%Y-%m-%d')
@@ -199,7 +220,7 @@ def fetch_upcoming_matches(competition_id="2021"):
     }
     
     try:
-        response = requests.get(base_url, headers=HEADERS, params=params)
+        response = get_client().get(f"/competitions/{competition_id}/matches", params=params)
         response.raise_for_status()
         
         data = response.json()